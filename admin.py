@@ -0,0 +1,79 @@
+import hmac
+import streamlit as st
+import pandas as pd
+from rate_limit import get_governor
+from settings import get_setting
+from storage import SUBMIT_STATS, StorageError, find_layer, get_store
+
+
+def display_admin():
+    st.title("🛠️ Admin")
+    password = get_setting("admin_password")
+    if not password:
+        # Backend errors and queue state are not for every visitor.
+        st.info("The admin page is disabled. Set `admin_password` in the app secrets to enable it.")
+        return
+    typed = st.text_input("Admin password:", type="password", key="admin_password")
+    if not hmac.compare_digest(typed.encode("utf-8"), password.encode("utf-8")):
+        st.info("Enter the admin password to see the service status.")
+        return
+
+    # GitHub API budget, as seen in the X-RateLimit-* headers
+    st.subheader("🚦 GitHub API Budget")
+    budget = get_governor().snapshot()
+    if budget["remaining"] is None:
+        st.info("No GitHub API calls made by this process yet.")
+    else:
+        columns = st.columns(3)
+        columns[0].metric("Remaining Calls", f"{budget['remaining']} / {budget['limit']}")
+        resets_in = budget["resets_in"]
+        columns[1].metric("Resets In", "–" if resets_in is None else f"{resets_in // 60}:{resets_in % 60:02d}")
+        columns[2].metric("Mode", "Throttled" if budget["under_pressure"] else "Normal")
+        if budget["under_pressure"]:
+            st.warning(
+                f"Fewer than {budget['reserve']} calls left: reads are served from the cache and "
+                "submissions are queued until the budget resets."
+            )
+    st.dataframe(pd.DataFrame([{
+        "Requests": budget["requests"], "Refused Locally": budget["blocked"], "Rate Limited": budget["limited"],
+    }]), hide_index=True)
+
+    try:
+        store = get_store()
+    except StorageError as e:
+        st.error(f"Failed to open the response store. {e}")
+        return
+
+    st.subheader("🔌 Backend Circuit")
+    resilient = find_layer(store, "breaker")
+    if resilient is None:
+        st.write("The configured backend is not behind a circuit breaker.")
+    else:
+        circuit = resilient.breaker.snapshot()
+        columns = st.columns(3)
+        columns[0].metric("State", circuit["state"].title())
+        columns[1].metric("Consecutive Failures", circuit["failures"])
+        columns[2].metric("Next Probe In", "–" if circuit["retry_in"] is None else f"{circuit['retry_in']} s")
+        if circuit["state"] != "closed":
+            st.warning("The backend is unavailable: reads come from local snapshots and submissions are queued.")
+        if circuit["last_error"]:
+            st.caption(f"Last error: {circuit['last_error']}")
+
+    st.subheader("🗄️ Read Cache")
+    cached = find_layer(store, "cache")
+    if cached is None:
+        st.write("The configured backend does not use the read cache.")
+    else:
+        stats = cached.cache.stats()
+        stats["hit_ratio"] = f"{stats['hit_ratio']:.0%}"
+        st.dataframe(pd.DataFrame([stats]), hide_index=True)
+
+    st.subheader("📨 Submissions")
+    st.dataframe(pd.DataFrame([SUBMIT_STATS.snapshot()]), hide_index=True)
+    queue = find_layer(store, "pending_count")
+    if queue is None:
+        st.write("Submissions are written straight to the backend.")
+    else:
+        st.metric("Queued Submissions", queue.pending_count())
+        if queue.last_error:
+            st.error(f"Last flush failed. {queue.last_error}")
@@ -0,0 +1,324 @@
+import os
+import sys
+import json
+import math
+import threading
+from bisect import bisect_left
+from settings import get_setting
+from storage import LOCAL_DATA_DIR, DelegatingStore, StorageError, find_layer
+
+
+class ScoreAggregate:
+    """Running score statistics that can be updated one entry at a time.
+
+    Keeps count, sum, sum of squares, min/max and a histogram of exact scores,
+    which is enough for mean, standard deviation and the score distribution
+    without revisiting the raw entries. Two aggregates can be merged.
+
+    Survey scores are small bounded integers, so the histogram is an exact,
+    mergeable quantile sketch: percentiles and "top X%" ranks are read from its
+    prefix sums, which are cached until the next update.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.total_sq = 0
+        self.min = None
+        self.max = None
+        self.histogram = {}
+        self._cdf = None
+
+    def add(self, score):
+        self.count += 1
+        self.total += score
+        self.total_sq += score * score
+        self.min = score if self.min is None else min(self.min, score)
+        self.max = score if self.max is None else max(self.max, score)
+        self.histogram[score] = self.histogram.get(score, 0) + 1
+        self._cdf = None
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        for bound in ("min", "max"):
+            mine, theirs = getattr(self, bound), getattr(other, bound)
+            pick = min if bound == "min" else max
+            setattr(self, bound, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        for score, count in other.histogram.items():
+            self.histogram[score] = self.histogram.get(score, 0) + count
+        self._cdf = None
+        return self
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    @property
+    def stddev(self):
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def _cumulative(self):
+        """Sorted distinct scores and how many responses score below each one."""
+        if self._cdf is None:
+            scores = sorted(self.histogram)
+            below, running = [], 0
+            for score in scores:
+                below.append(running)
+                running += self.histogram[score]
+            self._cdf = (scores, below)
+        return self._cdf
+
+    def count_below(self, score):
+        """Number of responses scoring strictly less than ``score``."""
+        scores, below = self._cumulative()
+        i = bisect_left(scores, score)
+        return below[i] if i < len(scores) else self.count
+
+    def top_percent(self, score):
+        """Share of responses (0-100) scoring at least ``score``: "top X%"."""
+        if not self.count:
+            return None
+        return 100 * (self.count - self.count_below(score)) / self.count
+
+    def percentile(self, q):
+        """Nearest-rank ``q``-th percentile (0-100) of the scores, from the histogram."""
+        if not self.count:
+            return None
+        target = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for score in sorted(self.histogram):
+            seen += self.histogram[score]
+            if seen >= target:
+                return score
+        return self.max
+
+    def summary(self):
+        return {"count": self.count, "mean": self.mean, "min": self.min, "max": self.max, "stddev": self.stddev}
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "total_sq": self.total_sq,
+            "min": self.min,
+            "max": self.max,
+            "histogram": {str(score): count for score, count in sorted(self.histogram.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregate = cls()
+        aggregate.count = data["count"]
+        aggregate.total = data["total"]
+        aggregate.total_sq = data["total_sq"]
+        aggregate.min = data["min"]
+        aggregate.max = data["max"]
+        aggregate.histogram = {int(score): count for score, count in data["histogram"].items()}
+        return aggregate
+
+    @classmethod
+    def from_entries(cls, entries):
+        aggregate = cls()
+        for entry in entries:
+            aggregate.add(entry["score"])
+        return aggregate
+
+
+class Distribution:
+    """Per-question answer counts and ``analyze_responses`` finding counts for a survey.
+
+    Multiselect answers count once per chosen option; slider and checkbox
+    answers are counted by their ``str`` value so the table stays JSON-friendly.
+    ``analyze`` is the survey's ``analyze_responses``; entries it cannot handle
+    still count towards the answers.
+    """
+
+    def __init__(self, analyze=None):
+        self.analyze = analyze
+        self.answers = {}
+        self.findings = {"good": {}, "improvement": {}}
+
+    @staticmethod
+    def _bump(counts, key, amount=1):
+        counts[key] = counts.get(key, 0) + amount
+
+    def add(self, responses):
+        for question, answer in responses.items():
+            counts = self.answers.setdefault(question, {})
+            for value in answer if isinstance(answer, list) else [answer]:
+                self._bump(counts, str(value))
+        if self.analyze is None:
+            return
+        try:
+            good, improvement = self.analyze(responses)
+        except (KeyError, TypeError, ValueError):
+            return
+        for kind, items in (("good", good), ("improvement", improvement)):
+            for item in items:
+                self._bump(self.findings[kind], item)
+
+    def merge(self, other):
+        for question, counts in other.answers.items():
+            mine = self.answers.setdefault(question, {})
+            for answer, count in counts.items():
+                self._bump(mine, answer, count)
+        for kind, counts in other.findings.items():
+            for item, count in counts.items():
+                self._bump(self.findings.setdefault(kind, {}), item, count)
+        return self
+
+    def to_dict(self):
+        return {"answers": self.answers, "findings": self.findings}
+
+    @classmethod
+    def from_dict(cls, data, analyze=None):
+        distribution = cls(analyze)
+        distribution.answers = {question: dict(counts) for question, counts in data["answers"].items()}
+        distribution.findings = {kind: dict(counts) for kind, counts in data["findings"].items()}
+        return distribution
+
+
+def survey_analyzer(file_name):
+    """The survey's ``analyze_responses`` function, or ``None`` for unknown files."""
+    # Imported lazily: the analysis pages import the storage layer themselves.
+    from analyze import ANALYZERS
+    return ANALYZERS.get(file_name)
+
+
+def build_tables(file_name, entries):
+    """One pass over ``entries`` into a ``(ScoreAggregate, Distribution)`` pair."""
+    aggregate, distribution = ScoreAggregate(), Distribution(survey_analyzer(file_name))
+    for entry in entries:
+        aggregate.add(entry["score"])
+        distribution.add(entry["responses"])
+    return aggregate, distribution
+
+
+class AggregatingStore(DelegatingStore):
+    """Keeps a ScoreAggregate and a Distribution per survey up to date as entries are appended.
+
+    Both live in ``<root>/<survey>.aggregate.json`` and are rewritten after every
+    successful append, so ``summary`` and the cohort view read precomputed tables
+    instead of loading the survey. The sidecar records how many entries it covers;
+    a missing one, or one whose count no longer matches the survey (data changed
+    outside this app), is rebuilt from the raw entries on first use. Run
+    ``python aggregates.py`` to rebuild all of them.
+    """
+
+    def __init__(self, inner, root=LOCAL_DATA_DIR):
+        super().__init__(inner)
+        self.root = root
+        self._aggregates = {}
+        self._distributions = {}
+        self._lock = threading.Lock()
+
+    def sidecar_path(self, file_name):
+        stem = os.path.splitext(os.path.basename(file_name))[0]
+        return os.path.join(self.root, f"{stem}.aggregate.json")
+
+    def _save(self, file_name):
+        path = self.sidecar_path(file_name)
+        os.makedirs(self.root, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            data = self._aggregates[file_name].to_dict()
+            data["distribution"] = self._distributions[file_name].to_dict()
+            # How many raw entries the tables cover, checked against the survey when loaded.
+            data["source_count"] = self._aggregates[file_name].count
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def _tables(self, file_name):
+        """Load (or build) the survey's aggregate and distribution; caller holds the lock."""
+        if file_name not in self._aggregates:
+            path = self.sidecar_path(file_name)
+            data = None
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            # Sidecars written before distributions were tracked, or out of step with the survey, are rebuilt.
+            if data is not None and "distribution" in data and self._current(file_name, data.get("source_count")):
+                self._aggregates[file_name] = ScoreAggregate.from_dict(data)
+                self._distributions[file_name] = Distribution.from_dict(
+                    data["distribution"], survey_analyzer(file_name)
+                )
+            else:
+                tables = build_tables(file_name, self.inner.iter_entries(file_name))
+                self._aggregates[file_name], self._distributions[file_name] = tables
+                self._save(file_name)
+        return self._aggregates[file_name], self._distributions[file_name]
+
+    def _current(self, file_name, source_count):
+        """True if a sidecar built from ``source_count`` entries still matches the survey."""
+        try:
+            return source_count == self.inner.count(file_name)
+        except StorageError:
+            # The backend is unreachable; the sidecar is the best there is.
+            return True
+
+    def aggregate(self, file_name):
+        """Return the survey's aggregate, loading or rebuilding it if needed."""
+        with self._lock:
+            return self._tables(file_name)[0]
+
+    def distribution(self, file_name):
+        """Return the survey's answer and finding counts, loading or rebuilding them if needed."""
+        with self._lock:
+            return self._tables(file_name)[1]
+
+    def rebuild(self, file_name):
+        """Recompute a survey's aggregate and distribution from the raw entries."""
+        aggregate, distribution = build_tables(file_name, self.inner.iter_entries(file_name))
+        with self._lock:
+            self._aggregates[file_name], self._distributions[file_name] = aggregate, distribution
+            self._save(file_name)
+        return aggregate
+
+    def append_batches(self, batches):
+        with self._lock:
+            for file_name in batches:
+                self._tables(file_name)
+        self.inner.append_batches(batches)
+        with self._lock:
+            for file_name, entries in batches.items():
+                aggregate, distribution = self._tables(file_name)
+                for entry in entries:
+                    aggregate.add(entry["score"])
+                    distribution.add(entry["responses"])
+                try:
+                    self._save(file_name)
+                except OSError:
+                    # The entries are committed; failing now would get them written again.
+                    self._discard(file_name)
+
+    def _discard(self, file_name):
+        """Forget a survey's tables and sidecar so they are rebuilt on next use; caller holds the lock."""
+        self._aggregates.pop(file_name, None)
+        self._distributions.pop(file_name, None)
+        try:
+            os.remove(self.sidecar_path(file_name))
+        except OSError:
+            pass
+
+    def summary(self, file_name):
+        return self.aggregate(file_name).summary()
+
+
+def main(file_names):
+    """Rebuild the aggregate sidecars for the given (or all) survey files."""
+    from result import FILES
+    from storage import get_store
+
+    store = find_layer(get_store(), "distribution")
+    if store is None:
+        store = AggregatingStore(get_store(), get_setting("local_data_dir", LOCAL_DATA_DIR))
+    for file_name in file_names or FILES.values():
+        print(f"{file_name}: {store.rebuild(file_name).summary()}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,8 +1,19 @@
 import streamlit as st
+import analyze_awareness as awareness_module
+import analyze_routine as routine_module
+import analyze_wellbeing as wellbeing_module
+import analyze_activities as activities_module
 from analyze_awareness import display_analysis as analyze_awareness
 from analyze_routine import display_routine_analysis as analyze_routine
 from analyze_wellbeing import display_wellbeing_analysis as analyze_wellbeing
 from analyze_activities import display_activities_analysis as analyze_activities
+from cohort import display_cohort
+
+# Each survey's analyze_responses, keyed by data file (used for the cohort tables)
+ANALYZERS = {
+    module.JSON_FILE: module.analyze_responses
+    for module in (awareness_module, routine_module, wellbeing_module, activities_module)
+}
 
 
 def display_analysis():
@@ -18,7 +29,8 @@ def display_analysis():
         "Awareness Analysis",
         "Routine Analysis",
         "Well-being Analysis",
-        "Activities Analysis"
+        "Activities Analysis",
+        "Cohort Overview"
     ])
 
     with tabs[0]:
@@ -36,3 +48,7 @@ def display_analysis():
     with tabs[3]:
         st.subheader("Activities Analysis")
         analyze_activities()
+
+    with tabs[4]:
+        st.subheader("Cohort Overview")
+        display_cohort()
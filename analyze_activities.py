@@ -1,75 +1,25 @@
 import streamlit as st
-import requests
-import json
-import base64
 import plotly.express as px
+from scoring import ACTIVITIES
+from storage import StorageError, get_store
+from response_browser import browse_responses
+from cohort import top_percent
 
-# Constants for GitHub integration
-GITHUB_USER = "hawkarabdulhaq"
-GITHUB_REPO = "energyscan"
-JSON_FILE = "data/activities.json"
-GITHUB_API_URL_JSON = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/contents/{JSON_FILE}"
+JSON_FILE = ACTIVITIES.file
 
 
-def get_github_pat():
-    """Retrieve GitHub PAT from Streamlit secrets."""
+def count_responses():
+    """Return the number of stored responses."""
     try:
-        return st.secrets["github_pat"]
-    except KeyError:
-        st.error("GitHub PAT not found in secrets! Please add `github_pat` to your secrets.")
-        return None
-
-
-def load_existing_data():
-    """Load existing data from the GitHub repository."""
-    github_pat = get_github_pat()
-    if not github_pat:
-        return []
-
-    headers = {"Authorization": f"token {github_pat}"}
-    response = requests.get(GITHUB_API_URL_JSON, headers=headers)
-
-    if response.status_code == 200:
-        content = response.json().get("content", "")
-        if content:
-            try:
-                return json.loads(base64.b64decode(content).decode("utf-8"))
-            except json.JSONDecodeError:
-                st.error("Failed to decode existing data. Returning an empty list.")
-                return []
-    elif response.status_code == 404:
-        st.warning("No existing data found.")
-        return []
-    else:
-        st.error(f"Failed to fetch data from GitHub. Error {response.status_code}: {response.text}")
-        return []
+        return get_store().count(JSON_FILE)
+    except StorageError as e:
+        st.error(f"Failed to fetch data. {e}")
+        return 0
 
 
 def classify_activities(responses):
     """Classify activities management based on responses."""
-    score = 0
-    score += 4 if responses["q1"] == "Always" else 3 if responses["q1"] == "Often" else 2 if responses["q1"] == "Rarely" else 1
-    score += 4 if responses["q2"] else 2
-    score += int(responses["q3"])
-    score += 4 if responses["q4"] == "Yes" else 2
-    score += sum([4, 3, 2, 1][["Write down expected outcomes for each task.",
-                               "Compare task outcomes with goals.",
-                               "Use a decision-making framework.",
-                               "Complete tasks randomly without evaluation."].index(strategy)] for strategy in responses.get("q5", []))
-    score += 4 if responses["q6"] == "Always" else 3 if responses["q6"] == "Often" else 2 if responses["q6"] == "Rarely" else 1
-    score += int(responses["q7"])
-
-    # Classify based on score
-    if score >= 40:
-        classification = "🎯 Excellent task prioritization and focus."
-    elif 30 <= score < 40:
-        classification = "✅ Good practices but room for optimization."
-    elif 20 <= score < 30:
-        classification = "⚠️ Moderate task management, with opportunities to improve focus."
-    else:
-        classification = "❌ Significant improvements needed in task prioritization and productivity."
-
-    return classification, score
+    return ACTIVITIES.classify(responses)
 
 
 def analyze_responses(responses):
@@ -119,33 +69,34 @@ def display_activities_analysis():
     This section evaluates your responses to the Activities Survey to highlight strengths and areas for improvement.
     """)
 
-    # Load data
-    data = load_existing_data()
-    if not data:
+    # Count stored responses without downloading them
+    total = count_responses()
+    if not total:
         st.warning("No data available for analysis.")
         return
 
-    # Select a specific response to analyze
+    # Browse and filter responses a page at a time; only that page is fetched
     st.markdown("### Select a Response to Analyze")
-    selected_index = st.selectbox(
-        "Choose a response:",
-        options=list(range(len(data))),
-        format_func=lambda i: f"Response {i + 1}",
-        key="activities_response_select"
-    )
-    selected_response = data[selected_index]["responses"]
+    st.caption(f"{total} responses stored.")
+    entry = browse_responses(JSON_FILE, ACTIVITIES, key="activities_responses")
+    if entry is None:
+        return
+    selected_response = entry["responses"]
 
     # Display classification
     classification, total_score = classify_activities(selected_response)
     st.subheader("📋 Classification Results")
     st.info(f"**Classification:** {classification}")
     st.metric("Total Score", f"{total_score}/50")
+    top = top_percent(JSON_FILE, total_score)
+    if top is not None:
+        st.caption(f"This response is in the top {top}% for Activities.")
 
     # Visualization of Score Distribution
     st.markdown("### 📊 Score Distribution")
     score_categories = ["Task Prioritization", "Clarity of Goals", "Focus & Productivity"]
     scores = [
-        4 if selected_response["q1"] == "Always" else 3 if selected_response["q1"] == "Often" else 2,
+        ACTIVITIES.points("q1", selected_response["q1"]),
         int(selected_response["q3"]),
         int(selected_response["q7"]),
     ]
@@ -1,82 +1,25 @@
 import streamlit as st
-import requests
-import json
-import base64
 import plotly.express as px
+from scoring import AWARENESS
+from storage import StorageError, get_store
+from response_browser import browse_responses
+from cohort import top_percent
 
-# Constants for GitHub integration
-GITHUB_USER = "hawkarabdulhaq"
-GITHUB_REPO = "energyscan"
-JSON_FILE = "data/awareness.json"
-GITHUB_API_URL_JSON = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/contents/{JSON_FILE}"
+JSON_FILE = AWARENESS.file
 
 
-def get_github_pat():
-    """Retrieve GitHub PAT from Streamlit secrets."""
+def count_responses():
+    """Return the number of stored responses."""
     try:
-        return st.secrets["github_pat"]
-    except KeyError:
-        st.error("GitHub PAT not found in secrets! Please add `github_pat` to your secrets.")
-        return None
-
-
-def load_existing_data():
-    """Load existing data from the GitHub repository."""
-    github_pat = get_github_pat()
-    if not github_pat:
-        return []
-
-    headers = {"Authorization": f"token {github_pat}"}
-    response = requests.get(GITHUB_API_URL_JSON, headers=headers)
-
-    if response.status_code == 200:
-        content = response.json().get("content", "")
-        if content:
-            try:
-                return json.loads(base64.b64decode(content).decode("utf-8"))
-            except json.JSONDecodeError:
-                st.error("Failed to decode existing data. Returning an empty list.")
-                return []
-    elif response.status_code == 404:
-        st.warning("No existing data found.")
-        return []
-    else:
-        st.error(f"Failed to fetch data from GitHub. Error {response.status_code}: {response.text}")
-        return []
+        return get_store().count(JSON_FILE)
+    except StorageError as e:
+        st.error(f"Failed to fetch data. {e}")
+        return 0
 
 
 def classify_responses(responses):
     """Classify the user's approach to task prioritization based on responses."""
-    score = 0
-
-    # Assign weights for each response
-    score += 4 if responses["q1"] == "Yes" else 2
-    score += responses["q2"]
-    score += {"A": 4, "B": 3, "C": 2, "D": 1}[responses["q3"][0]]
-    score += responses["q4"]
-    strategy_scores = {
-        "A. Adjust tasks to match energy levels.": 4,
-        "B. Take a short break or recharge.": 3,
-        "C. Push through regardless.": 2,
-        "D. Delay tasks until later.": 1
-    }
-    score += sum(strategy_scores[strategy] for strategy in responses["q5"])
-    score += 4 if responses["q6"] == "Yes" else 2
-    score += responses["q7"]
-    score += 4 if responses["q8"] == "Yes" else 2
-    score += responses["q9"]
-
-    # Classify based on score
-    if score >= 35:
-        classification = "🎯 Prioritizes essential, goal-oriented activities with clear impact."
-    elif 28 <= score < 35:
-        classification = "✅ Focuses on impactful tasks most of the time but occasionally gets sidetracked."
-    elif 20 <= score < 28:
-        classification = "⚠️ Mixes impactful and trivial tasks, leading to diluted results."
-    else:
-        classification = "❌ Focuses primarily on low-value tasks; lacks clarity on priorities."
-
-    return classification, score
+    return AWARENESS.classify(responses)
 
 
 def analyze_responses(responses):
@@ -134,32 +77,34 @@ def display_analysis():
     This section analyzes your responses to the Awareness Survey to provide actionable insights and recommendations.
     """)
 
-    # Load data
-    data = load_existing_data()
-    if not data:
+    # Count stored responses without downloading them
+    total = count_responses()
+    if not total:
         st.warning("No data available for analysis.")
         return
 
-    # Select a specific response to analyze
+    # Browse and filter responses a page at a time; only that page is fetched
     st.markdown("### Select a Response to Analyze")
-    selected_index = st.selectbox(
-        "Choose a response:",
-        options=list(range(len(data))),
-        format_func=lambda i: f"Response {i + 1}"
-    )
-    selected_response = data[selected_index]["responses"]
+    st.caption(f"{total} responses stored.")
+    entry = browse_responses(JSON_FILE, AWARENESS, key="awareness_responses")
+    if entry is None:
+        return
+    selected_response = entry["responses"]
 
     # Display classification
     classification, total_score = classify_responses(selected_response)
     st.subheader("📋 Classification Results")
     st.info(f"**Classification:** {classification}")
     st.metric("Total Score", f"{total_score}/40")
+    top = top_percent(JSON_FILE, total_score)
+    if top is not None:
+        st.caption(f"This response is in the top {top}% for Awareness.")
 
     # Visualization of Score Distribution
     st.markdown("### 📊 Score Distribution")
     score_categories = ["Energy Awareness", "Task Alignment", "Consistency", "Self-Reflection"]
     scores = [
-        selected_response["q2"] + {"A": 4, "B": 3, "C": 2, "D": 1}[selected_response["q3"][0]],
+        selected_response["q2"] + AWARENESS.points("q3", selected_response["q3"]),
         selected_response["q4"],
         selected_response["q7"],
         selected_response["q9"]
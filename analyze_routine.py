@@ -1,75 +1,25 @@
 import streamlit as st
-import requests
-import json
-import base64
 import plotly.express as px
+from scoring import ROUTINE
+from storage import StorageError, get_store
+from response_browser import browse_responses
+from cohort import top_percent
 
-# Constants for GitHub integration
-GITHUB_USER = "hawkarabdulhaq"
-GITHUB_REPO = "energyscan"
-JSON_FILE = "data/routine.json"
-GITHUB_API_URL_JSON = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/contents/{JSON_FILE}"
+JSON_FILE = ROUTINE.file
 
 
-def get_github_pat():
-    """Retrieve GitHub PAT from Streamlit secrets."""
+def count_responses():
+    """Return the number of stored responses."""
     try:
-        return st.secrets["github_pat"]
-    except KeyError:
-        st.error("GitHub PAT not found in secrets! Please add `github_pat` to your secrets.")
-        return None
-
-
-def load_existing_data():
-    """Load existing data from the GitHub repository."""
-    github_pat = get_github_pat()
-    if not github_pat:
-        return []
-
-    headers = {"Authorization": f"token {github_pat}"}
-    response = requests.get(GITHUB_API_URL_JSON, headers=headers)
-
-    if response.status_code == 200:
-        content = response.json().get("content", "")
-        if content:
-            try:
-                return json.loads(base64.b64decode(content).decode("utf-8"))
-            except json.JSONDecodeError:
-                st.error("Failed to decode existing data. Returning an empty list.")
-                return []
-    elif response.status_code == 404:
-        st.warning("No existing data found.")
-        return []
-    else:
-        st.error(f"Failed to fetch data from GitHub. Error {response.status_code}: {response.text}")
-        return []
+        return get_store().count(JSON_FILE)
+    except StorageError as e:
+        st.error(f"Failed to fetch data. {e}")
+        return 0
 
 
 def classify_routine(responses):
     """Classify routine management based on survey responses."""
-    score = 0
-
-    # Assign weights for each response
-    score += 4 if responses["q1"] == "Yes" else 2
-    score += responses["q2"]
-    score += responses["q3"]
-    strategy_scores = {"A. Prioritize tasks.": 4, "B. Delegate tasks.": 3, "C. Reschedule activities.": 2, "D. Skip low-priority tasks.": 1}
-    score += sum(strategy_scores.get(strategy, 0) for strategy in responses["q4"])
-    score += 4 if responses["q5"] == "Yes" else 2
-    score += responses["q6"]
-    score += 4 if responses["q7"] == "Yes" else 2
-
-    # Classify based on score
-    if score >= 35:
-        classification = "🎯 Highly consistent and adaptable routines with a focus on self-care and improvement."
-    elif 28 <= score < 35:
-        classification = "✅ Good routine management but with room for better adaptability and self-care."
-    elif 20 <= score < 28:
-        classification = "⚠️ Mixed routines, with gaps in consistency and self-care."
-    else:
-        classification = "❌ Lacks consistent routines and adaptability; needs significant improvements."
-
-    return classification, score
+    return ROUTINE.classify(responses)
 
 
 def analyze_responses(responses):
@@ -119,27 +69,28 @@ def display_routine_analysis():
     This section analyzes your responses to the Routine Survey to identify strengths and areas for improvement.
     """)
 
-    # Load data
-    data = load_existing_data()
-    if not data:
+    # Count stored responses without downloading them
+    total = count_responses()
+    if not total:
         st.warning("No data available for analysis.")
         return
 
-    # Select a specific response to analyze
+    # Browse and filter responses a page at a time; only that page is fetched
     st.markdown("### Select a Response to Analyze")
-    selected_index = st.selectbox(
-        "Choose a response:",
-        options=list(range(len(data))),
-        format_func=lambda i: f"Response {i + 1}",
-        key="routine_response_select"
-    )
-    selected_response = data[selected_index]["responses"]
+    st.caption(f"{total} responses stored.")
+    entry = browse_responses(JSON_FILE, ROUTINE, key="routine_responses")
+    if entry is None:
+        return
+    selected_response = entry["responses"]
 
     # Display classification
     classification, total_score = classify_routine(selected_response)
     st.subheader("📋 Classification Results")
     st.info(f"**Classification:** {classification}")
     st.metric("Total Score", f"{total_score}/40")
+    top = top_percent(JSON_FILE, total_score)
+    if top is not None:
+        st.caption(f"This response is in the top {top}% for Routine.")
 
     # Visualization of Score Distribution
     st.markdown("### 📊 Score Distribution")
@@ -148,7 +99,7 @@ def display_routine_analysis():
         selected_response["q2"],
         selected_response["q3"],
         selected_response["q6"],
-        4 if selected_response["q7"] == "Yes" else 2
+        ROUTINE.points("q7", selected_response["q7"])
     ]
     fig = px.bar(x=score_categories, y=scores, labels={"x": "Category", "y": "Score"}, title="Score Distribution")
     st.plotly_chart(fig, use_container_width=True)
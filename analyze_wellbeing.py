@@ -1,83 +1,25 @@
 import streamlit as st
-import requests
-import json
-import base64
 import plotly.express as px
+from scoring import WELLBEING
+from storage import StorageError, get_store
+from response_browser import browse_responses
+from cohort import top_percent
 
-# Constants for GitHub integration
-GITHUB_USER = "hawkarabdulhaq"
-GITHUB_REPO = "energyscan"
-JSON_FILE = "data/wellbeing.json"
-GITHUB_API_URL_JSON = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/contents/{JSON_FILE}"
+JSON_FILE = WELLBEING.file
 
 
-def get_github_pat():
-    """Retrieve GitHub PAT from Streamlit secrets."""
+def count_responses():
+    """Return the number of stored responses."""
     try:
-        return st.secrets["github_pat"]
-    except KeyError:
-        st.error("GitHub PAT not found in secrets! Please add `github_pat` to your secrets.")
-        return None
-
-
-def load_existing_data():
-    """Load existing data from the GitHub repository."""
-    github_pat = get_github_pat()
-    if not github_pat:
-        return []
-
-    headers = {"Authorization": f"token {github_pat}"}
-    response = requests.get(GITHUB_API_URL_JSON, headers=headers)
-
-    if response.status_code == 200:
-        content = response.json().get("content", "")
-        if content:
-            try:
-                return json.loads(base64.b64decode(content).decode("utf-8"))
-            except json.JSONDecodeError:
-                st.error("Failed to decode existing data. Returning an empty list.")
-                return []
-    elif response.status_code == 404:
-        st.warning("No existing data found.")
-        return []
-    else:
-        st.error(f"Failed to fetch data from GitHub. Error {response.status_code}: {response.text}")
-        return []
+        return get_store().count(JSON_FILE)
+    except StorageError as e:
+        st.error(f"Failed to fetch data. {e}")
+        return 0
 
 
 def classify_wellbeing(responses):
     """Classify well-being based on survey responses."""
-    response_scores = {
-        "q5": {
-            "Rarely, I manage my mental energy well.": 4,
-            "Occasionally, but it’s manageable.": 3,
-            "Frequently, it impacts my productivity.": 2,
-            "Almost always, I feel exhausted.": 1,
-        },
-    }
-
-    score = 0
-    score += 4 if responses["q1"] == "Yes" else 2
-    score += 4 if responses["q2"] == "Yes" else 2
-    score += int(responses["q3"])  # q3 is an integer slider
-    score += 4 if responses["q4"] == "Yes" else 2
-    score += response_scores["q5"].get(responses["q5"], 0)
-    score += int(responses["q6"])  # q6 is an integer slider
-    score += len(responses.get("q7", [])) * 2  # Handle multiselect as list
-    score += int(responses["q8"])  # q8 is an integer slider
-    score += 4 if responses["q9"] == "Yes" else 2
-
-    # Classify based on score
-    if score >= 40:
-        classification = "🎯 Excellent balance and self-care practices."
-    elif 30 <= score < 40:
-        classification = "✅ Good well-being practices but room for improvement."
-    elif 20 <= score < 30:
-        classification = "⚠️ Moderate well-being, with gaps in self-care and social connections."
-    else:
-        classification = "❌ Needs significant improvements in work-life balance and self-care."
-
-    return classification, score
+    return WELLBEING.classify(responses)
 
 
 def analyze_responses(responses):
@@ -135,35 +77,36 @@ def display_wellbeing_analysis():
     This section evaluates your responses to the Well-being Survey to highlight strengths and areas for improvement.
     """)
 
-    # Load data
-    data = load_existing_data()
-    if not data:
+    # Count stored responses without downloading them
+    total = count_responses()
+    if not total:
         st.warning("No data available for analysis.")
         return
 
-    # Select a specific response to analyze
+    # Browse and filter responses a page at a time; only that page is fetched
     st.markdown("### Select a Response to Analyze")
-    selected_index = st.selectbox(
-        "Choose a response:",
-        options=list(range(len(data))),
-        format_func=lambda i: f"Response {i + 1}",
-        key="wellbeing_response_select"
-    )
-    selected_response = data[selected_index]["responses"]
+    st.caption(f"{total} responses stored.")
+    entry = browse_responses(JSON_FILE, WELLBEING, key="wellbeing_responses")
+    if entry is None:
+        return
+    selected_response = entry["responses"]
 
     # Display classification
     classification, total_score = classify_wellbeing(selected_response)
     st.subheader("📋 Classification Results")
     st.info(f"**Classification:** {classification}")
     st.metric("Total Score", f"{total_score}/50")
+    top = top_percent(JSON_FILE, total_score)
+    if top is not None:
+        st.caption(f"This response is in the top {top}% for Well-being.")
 
     # Visualization of Score Distribution
     st.markdown("### 📊 Score Distribution")
     score_categories = ["Work-Life Balance", "Healthy Lifestyle", "Social Connection", "Reflection"]
     scores = [
-        4 if selected_response["q1"] == "Yes" else 2,
+        WELLBEING.points("q1", selected_response["q1"]),
         int(selected_response["q6"]),
-        len(selected_response.get("q7", [])) * 2,
+        WELLBEING.points("q7", selected_response.get("q7", [])),
         int(selected_response["q8"]),
     ]
     fig = px.bar(x=score_categories, y=scores, labels={"x": "Category", "y": "Score"}, title="Score Distribution")
@@ -2,6 +2,7 @@ import streamlit as st
 from survey import display_questionary
 from analyze import display_analysis
 from result import display_results
+from admin import display_admin
 
 # App Settings
 APP_NAME = "Scan Your Energy Performance Lab"
@@ -20,6 +21,8 @@ def main():
         st.session_state["current_page"] = "Analyze"
     if st.sidebar.button("📈 Results"):
         st.session_state["current_page"] = "Results"
+    if st.sidebar.button("🛠️ Admin"):
+        st.session_state["current_page"] = "Admin"
 
     # Sidebar Footer
     st.sidebar.markdown("---")
@@ -36,6 +39,8 @@ def main():
         display_analysis()
     elif st.session_state["current_page"] == "Results":
         display_results()
+    elif st.session_state["current_page"] == "Admin":
+        display_admin()
 
 def home_page():
     # App Title
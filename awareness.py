@@ -1,84 +1,19 @@
 import streamlit as st
-import json
-import requests
-import base64
+from scoring import AWARENESS
+from storage import StorageError, get_store, new_entry
+from respondents import attempt_id, attempt_saved, next_attempt, respondent_id
 
-# Constants for GitHub integration
-GITHUB_USER = "hawkarabdulhaq"
-GITHUB_REPO = "energyscan"
-JSON_FILE = "data/awareness.json"
-GITHUB_API_URL_JSON = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/contents/{JSON_FILE}"
+JSON_FILE = AWARENESS.file
 
 
-def get_github_pat():
-    """Retrieve GitHub PAT from Streamlit secrets."""
+def save_results(data):
+    """Append a submission to the configured response store."""
     try:
-        return st.secrets["github_pat"]
-    except KeyError:
-        st.error("GitHub PAT not found in secrets! Please add `github_pat` to your secrets.")
-        return None
-
-
-def load_existing_data():
-    """Load existing data from the GitHub repository."""
-    github_pat = get_github_pat()
-    if not github_pat:
-        return []
-
-    headers = {"Authorization": f"token {github_pat}"}
-    response = requests.get(GITHUB_API_URL_JSON, headers=headers)
-
-    if response.status_code == 200:
-        content = response.json().get("content", "")
-        if content:
-            try:
-                return json.loads(base64.b64decode(content).decode("utf-8"))
-            except json.JSONDecodeError:
-                st.error("Failed to decode existing data. Initializing as an empty list.")
-                return []
-    elif response.status_code == 404:
-        st.warning("No existing data found. A new file will be created.")
-        return []
-    else:
-        st.error(f"Failed to fetch data from GitHub. Error {response.status_code}: {response.text}")
-        return []
-
-
-def save_results_to_github(data):
-    """Save or update data in the GitHub repository."""
-    github_pat = get_github_pat()
-    if not github_pat:
-        return
-
-    existing_data = load_existing_data()
-    existing_data.append(data)
-
-    headers = {
-        "Authorization": f"token {github_pat}",
-        "Accept": "application/vnd.github.v3+json",
-    }
-
-    # Encode content and prepare payload
-    encoded_content = base64.b64encode(json.dumps(existing_data, indent=4).encode("utf-8")).decode("utf-8")
-    commit_message = "Update awareness.json with new responses"
-
-    # Get the SHA of the existing file (if exists)
-    sha = None
-    response = requests.get(GITHUB_API_URL_JSON, headers=headers)
-    if response.status_code == 200:
-        sha = response.json().get("sha", None)
-
-    payload = {"message": commit_message, "content": encoded_content}
-    if sha:
-        payload["sha"] = sha
-
-    # Save the updated file
-    save_response = requests.put(GITHUB_API_URL_JSON, headers=headers, json=payload)
-
-    if save_response.status_code in [200, 201]:
-        st.success("Results successfully saved to GitHub!")
-    else:
-        st.error(f"Failed to save results to GitHub. Error {save_response.status_code}: {save_response.text}")
+        get_store().append(JSON_FILE, data)
+    except StorageError as e:
+        st.error(f"Failed to save results. {e}")
+        return False
+    return True
 
 
 def awareness_test():
@@ -193,20 +128,9 @@ def awareness_test():
     # Submit Test
     if st.button("Submit Test"):
         responses = st.session_state["awareness_responses"]
-        score = 0
-        score += 4 if responses["q1"] == "Yes" else 2
-        score += responses["q2"]
-        score += {"A": 4, "B": 3, "C": 2, "D": 1}[responses["q3"][0]]
-        score += responses["q4"]
-        strategy_scores = {"A. Adjust tasks to match energy levels.": 4, 
-                           "B. Take a short break or recharge.": 3, 
-                           "C. Push through regardless.": 2, 
-                           "D. Delay tasks until later.": 1}
-        score += sum(strategy_scores[strategy] for strategy in responses["q5"])
-        score += 4 if responses["q6"] == "Yes" else 2
-        score += responses["q7"]
-        score += 4 if responses["q8"] == "Yes" else 2
-        score += responses["q9"]
-
-        save_results_to_github({"score": score, "responses": responses})
-        st.success("Your results have been saved successfully!")
+        score = AWARENESS.score(responses)
+
+        if save_results(new_entry(score, responses, respondent_id(), attempt_id(JSON_FILE, responses))):
+            attempt_saved(JSON_FILE, responses)
+            st.success("Your results have been saved successfully!")
+            st.button("Start a New Attempt", key="awareness_retake", on_click=next_attempt, args=(JSON_FILE,))
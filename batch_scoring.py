@@ -0,0 +1,128 @@
+import numpy as np
+from scoring import MULTISELECT, SCORERS, SLIDER
+
+# Radio/checkbox answers that are not in the spec encode to this index
+UNKNOWN = -1
+
+# Rows scored per step when consuming a stream of responses
+BATCH_SIZE = 50_000
+
+
+def iter_batches(items, size):
+    """Group any iterable into lists of up to ``size`` items, e.g. streamed entries."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _scorer(survey):
+    return SCORERS[survey] if isinstance(survey, str) else survey
+
+
+def encode_responses(survey, responses):
+    """Encode a sequence of ``responses`` dicts into one NumPy column per question.
+
+    Sliders become their integer value, radios and checkboxes the index of the
+    chosen option (``UNKNOWN`` if it is not in the spec) and multiselects a
+    bitmask with bit ``i`` set when option ``i`` was chosen.
+    """
+    scorer = _scorer(survey)
+    responses = responses if isinstance(responses, list) else list(responses)
+    n = len(responses)
+    columns = {}
+    for question, spec in scorer.questions.items():
+        if spec["type"] == SLIDER:
+            columns[question] = np.fromiter((int(r[question]) for r in responses), dtype=np.int16, count=n)
+        elif spec["type"] == MULTISELECT:
+            bits = {option: 1 << i for option, i in scorer.option_index[question].items()}
+            columns[question] = np.fromiter(
+                (sum(bits.get(o, 0) for o in r.get(question) or ()) for r in responses),
+                dtype=np.uint16,
+                count=n,
+            )
+        else:
+            index = scorer.option_index[question]
+            columns[question] = np.fromiter(
+                (index.get(r.get(question), UNKNOWN) for r in responses), dtype=np.int8, count=n
+            )
+    return columns
+
+
+def _lookup_tables(scorer):
+    """Per-question point tables indexed by encoded value, built once per scorer."""
+    tables = getattr(scorer, "_batch_tables", None)
+    if tables is None:
+        tables = {}
+        for question, spec in scorer.questions.items():
+            if spec["type"] == SLIDER:
+                continue
+            points = [scorer.points(question, option) for option in scorer.options[question]]
+            if spec["type"] == MULTISELECT:
+                # Points for every possible bitmask, so a multiselect is one gather.
+                tables[question] = np.array(
+                    [sum(p for i, p in enumerate(points) if mask >> i & 1) for mask in range(1 << len(points))],
+                    dtype=np.int32,
+                )
+            else:
+                # Trailing 0 is picked up by UNKNOWN (-1).
+                tables[question] = np.array(points + [0], dtype=np.int32)
+        scorer._batch_tables = tables
+    return tables
+
+
+def score_columns(survey, columns):
+    """Total score per row for already encoded columns."""
+    scorer = _scorer(survey)
+    tables = _lookup_tables(scorer)
+    scores = None
+    for question, spec in scorer.questions.items():
+        column = columns[question]
+        points = column.astype(np.int32) if spec["type"] == SLIDER else tables[question][column]
+        scores = points if scores is None else scores + points
+    return scores
+
+
+def classify_scores(survey, scores):
+    """Class index per score (into ``scorer.labels``, lowest class first)."""
+    scorer = _scorer(survey)
+    thresholds = np.asarray(scorer.thresholds)
+    return np.maximum(np.searchsorted(thresholds, scores, side="right") - 1, 0)
+
+
+def score_batch(survey, responses):
+    """Score many responses at once; matches ``CompiledScorer.score`` row by row."""
+    return score_columns(survey, encode_responses(survey, responses))
+
+
+def classify_batch(survey, responses):
+    """Return ``(class_indices, scores)`` arrays for many responses."""
+    scores = score_batch(survey, responses)
+    return classify_scores(survey, scores), scores
+
+
+def rescore_entries(survey, entries, batch_size=BATCH_SIZE):
+    """Yield ``(class_indices, scores)`` per batch of a stream of stored entries.
+
+    Only one batch of entries is held at a time, so a whole survey can be
+    rescored straight from ``store.iter_entries``.
+    """
+    for batch in iter_batches(entries, batch_size):
+        yield classify_batch(survey, [entry["responses"] for entry in batch])
+
+
+def classification_counts(survey, responses, batch_size=BATCH_SIZE):
+    """Number of responses in each classification, keyed by label.
+
+    ``responses`` may be any iterable; it is scored ``batch_size`` rows at a time.
+    """
+    scorer = _scorer(survey)
+    counts = np.zeros(len(scorer.labels), dtype=np.int64)
+    for batch in iter_batches(responses, batch_size):
+        class_indices, _ = classify_batch(scorer, batch)
+        counts += np.bincount(class_indices, minlength=len(scorer.labels))
+    return {label: int(count) for label, count in zip(scorer.labels, counts)}
@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from storage import DelegatingStore, LocalJsonStore, StorageError, WriteConflict, WriteTimeout
+
+# Circuit states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpen(StorageError):
+    """Raised instead of calling the backend while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Counts consecutive backend failures and stops calling a backend that keeps failing.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls are
+    refused for ``reset_timeout`` seconds. Then it is half-open: a single probe
+    call is let through, closing the circuit on success and reopening it (with
+    a fresh timeout) on failure. Thread-safe.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        # Caller holds the lock.
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return OPEN
+        return HALF_OPEN
+
+    def would_allow(self):
+        """True if ``allow`` would let a call through right now (without taking the probe)."""
+        with self._lock:
+            state = self._state()
+            return state == CLOSED or (state == HALF_OPEN and not self._probing)
+
+    def allow(self):
+        """Return True if a call may go to the backend; in half-open state only one may."""
+        with self._lock:
+            state = self._state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = None if error is None else str(error)
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def snapshot(self):
+        """State and counters for the admin page."""
+        with self._lock:
+            state = self._state()
+            retry_in = None
+            if state == OPEN:
+                retry_in = max(0, int(self.reset_timeout - (time.monotonic() - self.opened_at)))
+            return {"state": state, "failures": self.failures, "retry_in": retry_in, "last_error": self.last_error}
+
+
+class ResilientStore(DelegatingStore):
+    """Puts a circuit breaker, a deadline and local snapshots in front of a remote backend.
+
+    Reads run on a worker thread and are abandoned after ``timeout`` seconds, so
+    a hanging backend cannot stall a page (streamed reads rely on the HTTP
+    timeouts instead). Timeouts and any other errors count as failures. While the
+    circuit is open, or when a read fails, reads are answered from the last good
+    snapshot in ``<snapshot_dir>/<survey>.json``.
+    Snapshots are refreshed in the background from a successful read at most
+    every ``snapshot_interval`` seconds; ``refresh_when`` can veto a refresh (used
+    to save API calls when the rate-limit budget is low).
+
+    Writes are refused with ``CircuitOpen`` while the circuit is open and get the
+    same deadline as reads: a write still running after ``timeout`` seconds counts
+    as a failure and raises ``WriteTimeout``, although it may still land later
+    (``writes_in_flight`` counts those). Wrap this store in a ``WriteBehindStore``
+    that queues while ``breaker.would_allow()`` is false, so submissions land on
+    its durable spool and are replayed once the backend recovers.
+    """
+
+    def __init__(self, inner, breaker, snapshot_dir, timeout=10.0, snapshot_interval=300.0, refresh_when=None):
+        super().__init__(inner)
+        self.breaker = breaker
+        self.snapshot_dir = snapshot_dir
+        self.snapshots = LocalJsonStore(snapshot_dir, indent=None)
+        self.timeout = timeout
+        self.snapshot_interval = snapshot_interval
+        self.refresh_when = refresh_when
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="resilient-store")
+        self._refreshing = set()
+        self._abandoned = set()
+        self._lock = threading.Lock()
+
+    def snapshot_path(self, file_name):
+        return os.path.join(self.snapshot_dir, os.path.basename(file_name))
+
+    def _snapshot_age(self, file_name):
+        path = self.snapshot_path(file_name)
+        return time.time() - os.path.getmtime(path) if os.path.exists(path) else None
+
+    def _refresh_snapshot(self, file_name):
+        """Stream the survey into a new snapshot file; runs on the worker pool."""
+        path = self.snapshot_path(file_name)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write("[")
+                for i, entry in enumerate(self.inner.iter_entries(file_name)):
+                    f.write(("," if i else "") + json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+                f.write("]")
+            os.replace(tmp, path)
+        except (StorageError, OSError):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        finally:
+            with self._lock:
+                self._refreshing.discard(file_name)
+
+    def _maybe_refresh(self, file_name):
+        age = self._snapshot_age(file_name)
+        if age is not None and age < self.snapshot_interval:
+            return
+        if self.refresh_when is not None and not self.refresh_when():
+            return
+        with self._lock:
+            if file_name in self._refreshing:
+                return
+            self._refreshing.add(file_name)
+        self._executor.submit(self._refresh_snapshot, file_name)
+
+    def _read(self, method, file_name, *args, **kwargs):
+        """Call ``inner.<method>`` through the breaker, falling back to the snapshot."""
+        error = None
+        if self.breaker.allow():
+            future = self._executor.submit(getattr(self.inner, method), file_name, *args, **kwargs)
+            try:
+                result = future.result(timeout=self.timeout)
+            except TimeoutError:
+                error = StorageError(f"Reading {file_name} timed out after {self.timeout:g} s.")
+            except IndexError:
+                # The backend answered: there is no entry at that position.
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                # Any other error ends a half-open probe; a bug must not leave the circuit stuck.
+                error = e
+            else:
+                self.breaker.record_success()
+                self._maybe_refresh(file_name)
+                return result
+            self.breaker.record_failure(error)
+        return self._from_snapshot(method, file_name, *args, error=error, **kwargs)
+
+    def _from_snapshot(self, method, file_name, *args, error=None, **kwargs):
+        if not os.path.exists(self.snapshot_path(file_name)):
+            raise error or CircuitOpen(f"The response store is unavailable and there is no local copy of {file_name}.")
+        return getattr(self.snapshots, method)(os.path.basename(file_name), *args, **kwargs)
+
+    def load(self, file_name):
+        return self._read("load", file_name)
+
+    def iter_entries(self, file_name):
+        if not self.breaker.allow():
+            yield from self._from_snapshot("iter_entries", file_name)
+            return
+        streamed, error = False, None
+        try:
+            for entry in self.inner.iter_entries(file_name):
+                streamed = True
+                yield entry
+        except Exception as e:
+            error = e
+            self.breaker.record_failure(e)
+            if streamed:
+                raise
+        finally:
+            # A caller that stops early still saw the backend answer.
+            if error is None:
+                self.breaker.record_success()
+        if error is not None:
+            yield from self._from_snapshot("iter_entries", file_name, error=error)
+        else:
+            self._maybe_refresh(file_name)
+
+    def count(self, file_name):
+        return self._read("count", file_name)
+
+    def get_entry(self, file_name, index):
+        return self._read("get_entry", file_name, index)
+
+    def summary(self, file_name):
+        return self._read("summary", file_name)
+
+    def query(self, file_name, **filters):
+        return self._read("query", file_name, **filters)
+
+    def find_respondent(self, file_name, respondent):
+        return self._read("find_respondent", file_name, respondent)
+
+    def writes_in_flight(self):
+        """Writes that timed out but are still running and may yet be committed."""
+        with self._lock:
+            self._abandoned = {future for future in self._abandoned if not future.done()}
+            return len(self._abandoned)
+
+    def append_batches(self, batches):
+        if not self.breaker.allow():
+            raise CircuitOpen("The response store is unavailable; the submission was not sent.")
+        future = self._executor.submit(self.inner.append_batches, batches)
+        try:
+            future.result(timeout=self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self._abandoned.add(future)
+            error = WriteTimeout(f"Writing {', '.join(batches)} timed out after {self.timeout:g} s.")
+            self.breaker.record_failure(error)
+            raise error
+        except WriteConflict:
+            # Losing a race with other writers means the backend is up.
+            self.breaker.record_success()
+            raise
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+        self.breaker.record_success()
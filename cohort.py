@@ -0,0 +1,130 @@
+import math
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from aggregates import ScoreAggregate, build_tables
+from scoring import SCORERS_BY_FILE
+from storage import StorageError, find_layer, get_store
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def load_cohort(file_name):
+    """Return the precomputed ``(ScoreAggregate, Distribution)`` for a survey.
+
+    With aggregates turned off the tables are built from a single streamed pass
+    over the stored entries instead.
+    """
+    store = get_store()
+    aggregates = find_layer(store, "distribution")
+    if aggregates is not None:
+        return aggregates.aggregate(file_name), aggregates.distribution(file_name)
+    return build_tables(file_name, store.iter_entries(file_name))
+
+
+def score_aggregate(file_name):
+    """The survey's ScoreAggregate: precomputed when aggregates are on, else one streamed pass."""
+    store = get_store()
+    aggregates = find_layer(store, "distribution")
+    if aggregates is not None:
+        return aggregates.aggregate(file_name)
+    return ScoreAggregate.from_entries(store.iter_entries(file_name))
+
+
+def top_percent(file_name, score):
+    """Rounded-up "top X%" of ``score`` among the stored responses, or ``None`` if unavailable."""
+    try:
+        share = score_aggregate(file_name).top_percent(score)
+    except StorageError:
+        return None
+    return None if share is None else max(1, math.ceil(share))
+
+
+def classification_counts(scorer, aggregate):
+    """Responses per classification (highest class first), from the score histogram."""
+    counts = dict.fromkeys(reversed(scorer.labels), 0)
+    for score, count in aggregate.histogram.items():
+        counts[scorer.classify_score(score)] += count
+    return counts
+
+
+def _answer_key(answer):
+    # Slider values are stored as strings; keep them in numeric order.
+    return (0, int(answer), "") if answer.lstrip("-").isdigit() else (1, 0, answer)
+
+
+def _finding_table(counts, total):
+    rows = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    return pd.DataFrame(
+        [(item, count, f"{count / total:.0%}") for item, count in rows], columns=["Finding", "Responses", "Share"]
+    )
+
+
+def display_cohort():
+    """Cohort-wide view of one survey: score distribution, classifications and answers."""
+    from result import FILES
+
+    name = st.radio("Survey:", list(FILES), horizontal=True, key="cohort_survey")
+    file_name = FILES[name]
+    scorer = SCORERS_BY_FILE[file_name]
+    try:
+        aggregate, distribution = load_cohort(file_name)
+    except StorageError as e:
+        st.error(f"Failed to fetch data. {e}")
+        return
+    if not aggregate.count:
+        st.warning("No data available for analysis.")
+        return
+
+    # Headline numbers
+    columns = st.columns(4)
+    columns[0].metric("Responses", aggregate.count)
+    columns[1].metric("Mean Score", f"{aggregate.mean:.1f}")
+    columns[2].metric("Std. Deviation", f"{aggregate.stddev:.1f}")
+    columns[3].metric("Median Score", aggregate.percentile(50))
+
+    st.markdown("### 📈 Percentiles")
+    st.dataframe(pd.DataFrame([{f"P{q}": aggregate.percentile(q) for q in PERCENTILES}]), hide_index=True)
+
+    # Score histogram and classification breakdown
+    st.markdown("### 📊 Score Distribution")
+    scores = sorted(aggregate.histogram)
+    fig = px.bar(
+        x=scores, y=[aggregate.histogram[score] for score in scores],
+        labels={"x": "Score", "y": "Responses"}, title="Score Histogram",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.markdown("### 🏷️ Classification Breakdown")
+    breakdown = classification_counts(scorer, aggregate)
+    fig = px.bar(
+        x=list(breakdown.values()), y=list(breakdown), orientation="h",
+        labels={"x": "Responses", "y": "Classification"}, title="Responses per Classification",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Answer frequencies for one question at a time
+    st.markdown("### ❓ Answers per Question")
+    questions = [question for question in scorer.questions if question in distribution.answers]
+    if questions:
+        question = st.selectbox("Question:", questions, key=f"cohort_question_{scorer.name}")
+        answers = distribution.answers[question]
+        order = [str(option) for option in scorer.options.get(question, ())]
+        labels = [answer for answer in order if answer in answers] + sorted(set(answers) - set(order), key=_answer_key)
+        fig = px.bar(
+            x=[answers[label] for label in labels], y=labels, orientation="h",
+            labels={"x": "Responses", "y": "Answer"}, title=f"Answers to {question}",
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    # How often each analysis finding comes up
+    st.markdown("### ✅ Most Common Strengths")
+    if distribution.findings["good"]:
+        st.dataframe(_finding_table(distribution.findings["good"], aggregate.count), hide_index=True)
+    else:
+        st.write("No strengths recorded yet.")
+    st.markdown("### 🔍 Most Common Areas for Improvement")
+    if distribution.findings["improvement"]:
+        st.dataframe(_finding_table(distribution.findings["improvement"], aggregate.count), hide_index=True)
+    else:
+        st.write("No areas for improvement recorded yet.")
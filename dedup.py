@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from storage import LOCAL_DATA_DIR, SUBMIT_STATS, DelegatingStore, StorageError, find_layer
+
+
+def entry_key(entry):
+    """An entry's idempotency key (see ``storage.new_entry``), or a hash of its content if it has none."""
+    if entry.get("key"):
+        return entry["key"]
+    return hashlib.sha256(json.dumps(entry, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class DedupStore(DelegatingStore):
+    """Drops repeat submissions before they reach the backend.
+
+    Keys of the last ``capacity`` saved entries are kept in an in-memory LRU,
+    loaded from and appended to ``<root>/dedup_keys.jsonl``, so a rerun or a
+    double click is answered without any network I/O. A key is reserved before
+    the write and released if it fails, so two concurrent identical submits
+    write once. Duplicates older than the LRU are not caught here; run
+    ``python dedup.py`` to remove those from the stored surveys.
+    """
+
+    def __init__(self, inner, root=LOCAL_DATA_DIR, capacity=10_000):
+        super().__init__(inner)
+        self.path = os.path.join(root, "dedup_keys.jsonl")
+        self.capacity = capacity
+        self._seen = None
+        self._lock = threading.Lock()
+
+    def _keys(self):
+        """The LRU of ``(file_name, key)``, loaded from the key log; caller holds the lock."""
+        if self._seen is None:
+            self._seen = OrderedDict()
+            lines = 0
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            record = json.loads(line)
+                            self._remember((record["file"], record["key"]))
+                            lines += 1
+            # Keep the log from growing without bound: only the LRU's keys matter.
+            if lines > 2 * self.capacity:
+                self._write_log()
+        return self._seen
+
+    def _remember(self, item):
+        self._seen[item] = True
+        self._seen.move_to_end(item)
+        while len(self._seen) > self.capacity:
+            self._seen.popitem(last=False)
+
+    def _write_log(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            f.writelines(json.dumps({"file": file_name, "key": key}) + "\n" for file_name, key in self._seen)
+        os.replace(self.path + ".tmp", self.path)
+
+    def append_batches(self, batches):
+        fresh, reserved = {}, []
+        with self._lock:
+            seen = self._keys()
+            for file_name, entries in batches.items():
+                for entry in entries:
+                    item = (file_name, entry_key(entry))
+                    if item in seen:
+                        SUBMIT_STATS.incr("duplicates")
+                        continue
+                    self._remember(item)
+                    reserved.append(item)
+                    fresh.setdefault(file_name, []).append(entry)
+        if not fresh:
+            return
+        try:
+            self.inner.append_batches(fresh)
+        except Exception:
+            with self._lock:
+                for item in reserved:
+                    self._seen.pop(item, None)
+            raise
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps({"file": file_name, "key": key}) + "\n" for file_name, key in reserved)
+            except OSError:
+                # The entries are saved; their keys stay in the in-memory LRU.
+                pass
+
+
+def compact(store, file_name):
+    """Remove repeat entries from one survey, keeping the first of each; returns them.
+
+    Works on the ``read_json``/``update_json`` document backends (``github``,
+    ``local`` and ``git``) where a survey is a single JSON array.
+    """
+    if find_layer(store, "manifest") is not None:
+        raise StorageError("Compaction does not support sharded surveys.")
+    document = find_layer(store, "update_json")
+    if document is None:
+        raise StorageError("Compaction needs the `github`, `local` or `git` backend.")
+    removed = []
+
+    def drop_repeats(data):
+        removed.clear()
+        kept, keys = [], set()
+        for entry in data or []:
+            key = entry_key(entry)
+            if key in keys:
+                removed.append(entry)
+            else:
+                keys.add(key)
+                kept.append(entry)
+        return kept
+
+    # update_json re-applies drop_repeats on conflicts, so `removed` is always from the saved version.
+    data, _ = document.read_json(file_name)
+    if len(drop_repeats(data)) == len(data or []):
+        return []
+    document.update_json(file_name, drop_repeats, f"Remove {len(removed)} duplicate responses")
+    return removed
+
+
+def main(file_names):
+    """Remove duplicate entries from the given (or all) survey files and rebuild derived state."""
+    from result import FILES
+    from storage import get_store
+
+    store = get_store()
+    pending = find_layer(store, "flush")
+    if pending is not None:
+        pending.flush()
+    for file_name in file_names or FILES.values():
+        removed = compact(store, file_name)
+        print(f"{file_name}: removed {len(removed)} duplicate entries")
+        if not removed:
+            continue
+        # Aggregates, respondent positions and histories counted the duplicates.
+        aggregates = find_layer(store, "distribution")
+        if aggregates is not None:
+            aggregates.rebuild(file_name)
+        index = find_layer(store, "rebuild_index")
+        if index is not None:
+            index.rebuild_index()
+        history = find_layer(store, "history_path")
+        for respondent in {entry["respondent"] for entry in removed if entry.get("respondent")}:
+            if history is not None and os.path.exists(history.history_path(respondent)):
+                os.remove(history.history_path(respondent))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from scoring import MULTISELECT, SCORERS_BY_FILE, SLIDER
+from storage import DelegatingStore, submitted_at
+
+# Version 2 stores ``submitted_at`` as epoch seconds in ``t``; version 1 kept it verbatim.
+ENCODING_VERSION = 2
+DECODABLE_VERSIONS = (1, 2)
+
+
+def _epoch_seconds(value):
+    """``value`` as whole epoch seconds, or ``None`` unless that gives back the exact same string."""
+    try:
+        seconds = int(datetime.fromisoformat(value).timestamp())
+    except (TypeError, ValueError):
+        return None
+    return seconds if datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec="seconds") == value else None
+
+
+def encode_entry(scorer, entry):
+    """Encode an entry's responses as a positional list of small integers.
+
+    The answers follow the question order of the survey's scoring spec: sliders
+    keep their value, radios and checkboxes become the option index and
+    multiselects a bitmask (bit ``i`` = option ``i``). An answer that is not in
+    the spec is stored as-is so nothing is lost. ``submitted_at`` becomes epoch
+    seconds in ``t`` when that round-trips exactly. Every other key, including
+    ``score``, is kept unchanged so stores can still filter and total entries.
+    """
+    if entry.get("v") is not None:
+        return entry
+    responses = entry["responses"]
+    answers = []
+    for question, spec in scorer.questions.items():
+        answer = responses.get(question)
+        if spec["type"] == SLIDER:
+            answers.append(answer)
+        elif spec["type"] == MULTISELECT:
+            index = scorer.option_index[question]
+            if all(option in index for option in answer or ()):
+                answers.append(sum(1 << index[option] for option in answer or ()))
+            else:
+                answers.append(list(answer))
+        else:
+            answers.append(scorer.option_index[question].get(answer, answer))
+    encoded = {"v": ENCODING_VERSION, **{key: value for key, value in entry.items() if key != "responses"}}
+    seconds = _epoch_seconds(entry.get("submitted_at"))
+    if seconds is not None:
+        del encoded["submitted_at"]
+        encoded["t"] = seconds
+    encoded["a"] = answers
+    return encoded
+
+
+def decode_entry(scorer, entry):
+    """Inverse of ``encode_entry``; entries without a version are returned unchanged.
+
+    Multiselect answers come back in the order the survey lists its options.
+    """
+    version = entry.get("v")
+    if version is None:
+        return entry
+    if version not in DECODABLE_VERSIONS:
+        raise ValueError(f"Unsupported entry encoding version {version}.")
+    responses = {}
+    for (question, spec), answer in zip(scorer.questions.items(), entry["a"]):
+        if spec["type"] == SLIDER:
+            responses[question] = answer
+        elif spec["type"] == MULTISELECT:
+            options = scorer.options[question]
+            responses[question] = answer if isinstance(answer, list) else [
+                option for i, option in enumerate(options) if answer >> i & 1
+            ]
+        else:
+            # Answers missing from the spec were stored raw; only plain ints are indices.
+            is_index = isinstance(answer, int) and not isinstance(answer, bool)
+            responses[question] = scorer.options[question][answer] if is_index else answer
+    decoded = {key: value for key, value in entry.items() if key not in ("v", "a", "t")}
+    if "t" in entry:
+        decoded["submitted_at"] = submitted_at(entry)
+    decoded["responses"] = responses
+    return decoded
+
+
+class CompactStore(DelegatingStore):
+    """Stores entries in the compact encoding and hands decoded entries to callers.
+
+    Surveys without a scoring spec pass through untouched, as do legacy entries
+    that were stored before the encoding was enabled, so old and new entries can
+    share a file.
+    """
+
+    @staticmethod
+    def _encode(file_name, entries):
+        scorer = SCORERS_BY_FILE.get(file_name)
+        return [encode_entry(scorer, entry) for entry in entries] if scorer else list(entries)
+
+    @staticmethod
+    def _decode(file_name, entry):
+        scorer = SCORERS_BY_FILE.get(file_name)
+        return decode_entry(scorer, entry) if scorer else entry
+
+    def load(self, file_name):
+        return [self._decode(file_name, entry) for entry in self.inner.load(file_name)]
+
+    def iter_entries(self, file_name):
+        for entry in self.inner.iter_entries(file_name):
+            yield self._decode(file_name, entry)
+
+    def append_batches(self, batches):
+        self.inner.append_batches(
+            {file_name: self._encode(file_name, entries) for file_name, entries in batches.items()}
+        )
+
+    def get_entry(self, file_name, index):
+        return self._decode(file_name, self.inner.get_entry(file_name, index))
+
+    def find_respondent(self, file_name, respondent):
+        found = self.inner.find_respondent(file_name, respondent)
+        return [(position, self._decode(file_name, entry)) for position, entry in found]
+
+    def query(self, file_name, **filters):
+        page = self.inner.query(file_name, **filters)
+        return [(position, self._decode(file_name, entry)) for position, entry in page]
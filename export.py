@@ -0,0 +1,121 @@
+import os
+import sys
+import argparse
+from datetime import datetime
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from batch_scoring import UNKNOWN, classify_scores, encode_responses, iter_batches, score_columns
+from scoring import CHECKBOX, MULTISELECT, SCORERS_BY_FILE, SLIDER
+
+# Rows per record batch / Parquet row group
+BATCH_SIZE = 50_000
+
+
+def multiselect_column(question, option):
+    return f"{question}: {option}"
+
+
+def survey_schema(scorer):
+    """Arrow schema for one survey: metadata, score, classification and typed answers.
+
+    Sliders are integers, checkboxes booleans, radios dictionary-encoded strings
+    and every multiselect option gets its own boolean column.
+    """
+    fields = [
+        pa.field("submitted_at", pa.timestamp("s", tz="UTC")),
+        pa.field("score", pa.int32()),
+        pa.field("classification", pa.dictionary(pa.int8(), pa.string())),
+    ]
+    for question, spec in scorer.questions.items():
+        if spec["type"] == SLIDER:
+            fields.append(pa.field(question, pa.int16()))
+        elif spec["type"] == CHECKBOX:
+            fields.append(pa.field(question, pa.bool_()))
+        elif spec["type"] == MULTISELECT:
+            fields.extend(
+                pa.field(multiselect_column(question, option), pa.bool_()) for option in scorer.options[question]
+            )
+        else:
+            fields.append(pa.field(question, pa.dictionary(pa.int8(), pa.string())))
+    return pa.schema(fields, metadata={"survey": scorer.name})
+
+
+def _dictionary(indices, values):
+    indices = np.asarray(indices, dtype=np.int8)
+    return pa.DictionaryArray.from_arrays(
+        pa.array(indices, mask=indices == UNKNOWN), pa.array(values, type=pa.string())
+    )
+
+
+def _timestamps(entries):
+    return pa.array(
+        [datetime.fromisoformat(e["submitted_at"]) if e.get("submitted_at") else None for e in entries],
+        type=pa.timestamp("s", tz="UTC"),
+    )
+
+
+def entries_to_batch(scorer, entries, schema=None):
+    """Flatten a list of entries into one Arrow RecordBatch.
+
+    Scores and classifications are recomputed with the vectorized scorer, so
+    the export reflects the current scoring spec.
+    """
+    schema = schema or survey_schema(scorer)
+    columns = encode_responses(scorer, [entry["responses"] for entry in entries])
+    scores = score_columns(scorer, columns)
+    arrays = [
+        _timestamps(entries),
+        pa.array(scores, type=pa.int32()),
+        _dictionary(classify_scores(scorer, scores), scorer.labels),
+    ]
+    for question, spec in scorer.questions.items():
+        column = columns[question]
+        if spec["type"] == SLIDER:
+            arrays.append(pa.array(column, type=pa.int16()))
+        elif spec["type"] == MULTISELECT:
+            arrays.extend(pa.array((column >> i & 1).astype(bool)) for i in range(len(scorer.options[question])))
+        elif spec["type"] == CHECKBOX:
+            checked = np.array([option is True for option in scorer.options[question]] + [False])
+            arrays.append(pa.array(checked[column], mask=column == UNKNOWN))
+        else:
+            arrays.append(_dictionary(column, scorer.options[question]))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def export_survey(store, file_name, path, batch_size=BATCH_SIZE):
+    """Write one survey to a Parquet file, one row group per ``batch_size`` entries.
+
+    Returns the number of rows written.
+    """
+    scorer = SCORERS_BY_FILE[file_name]
+    schema = survey_schema(scorer)
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for chunk in iter_batches(store.iter_entries(file_name), batch_size):
+            writer.write_batch(entries_to_batch(scorer, chunk, schema), row_group_size=batch_size)
+            rows += len(chunk)
+    return rows
+
+
+def main(argv=None):
+    from result import FILES
+    from storage import get_store
+
+    parser = argparse.ArgumentParser(description="Export survey responses to Parquet.")
+    parser.add_argument("surveys", nargs="*", help=f"surveys to export (default: all of {', '.join(FILES)})")
+    parser.add_argument("--out", default="export", help="output directory")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per row group")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out, exist_ok=True)
+    store = get_store()
+    for name, file_name in FILES.items():
+        if args.surveys and name not in args.surveys:
+            continue
+        path = os.path.join(args.out, f"{os.path.splitext(os.path.basename(file_name))[0]}.parquet")
+        print(f"{name}: {export_survey(store, file_name, path, args.batch_size)} rows -> {path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
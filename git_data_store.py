@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import random
+import threading
+import requests
+import http_client
+from json_stream import iter_json_array
+from rate_limit import get_governor
+from storage import (
+    GITHUB_API_URL, GITHUB_REPO, GITHUB_USER, SUBMIT_STATS, ResponseStore, StorageError, WriteConflict, dump_json,
+)
+
+
+class GitDataStore(ResponseStore):
+    """Reads and writes survey files through the GitHub Git Data API.
+
+    Unlike the Contents API this has no inline-content size limit: files are
+    read as raw blobs (streamed, no base64 round trip) and written by creating
+    a blob, a tree and a commit, then fast-forwarding the branch. Several files
+    can therefore be updated in one atomic commit (``commit_files``).
+
+    The version of a file is its blob SHA, as with the Contents API, so the
+    ``read_json``/``write_json``/``update_json`` document API behaves the same
+    and ShardedStore can sit on top of either backend. Blobs are immutable, so
+    decoded blobs are cached by SHA.
+    """
+
+    atomic_batches = True
+
+    def __init__(self, token, user=GITHUB_USER, repo=GITHUB_REPO, branch="main", api_url=GITHUB_API_URL,
+                 max_retries=5, backoff=0.2, max_backoff=3.0, blob_cache_size=64, head_ttl=30.0, indent=4):
+        self.token = token
+        self.branch = branch
+        self.repo_url = f"{api_url.rstrip('/')}/repos/{user}/{repo}"
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.blob_cache_size = blob_cache_size
+        self.head_ttl = head_ttl
+        self.indent = indent
+        self._head = None
+        self._blobs = {}
+        self._trees = {}
+        self._lock = threading.Lock()
+        # Commits on one branch are serialized anyway; queueing this process's
+        # writers here leaves the retry loop for races with other processes.
+        self._write_lock = threading.Lock()
+
+    def _headers(self, accept="application/vnd.github+json"):
+        if not self.token:
+            raise StorageError("GitHub PAT not found in secrets! Please add `github_pat` to your secrets.")
+        return {"Authorization": f"token {self.token}", "Accept": accept}
+
+    def _request(self, method, path, expected=(200,), accept="application/vnd.github+json", **kwargs):
+        try:
+            response = http_client.request(method, f"{self.repo_url}/{path}", headers=self._headers(accept), **kwargs)
+        except requests.RequestException as e:
+            raise StorageError(f"GitHub request {method} {path} failed. {e}")
+        if response.status_code in (409, 422) and method in ("PATCH", "POST"):
+            raise WriteConflict(f"{method} {path} rejected. Error {response.status_code}: {response.text}")
+        if response.status_code not in expected:
+            raise StorageError(f"GitHub request {method} {path} failed. Error {response.status_code}: {response.text}")
+        return response
+
+    def head(self, revalidate=True):
+        """Return ``(commit_sha, tree_sha)`` of the branch head.
+
+        With ``revalidate=False`` a head seen less than ``head_ttl`` seconds ago is
+        reused, so plain reads cost a single (usually cached) blob lookup. While
+        the API budget is under pressure the last known head is reused at any age.
+        """
+        with self._lock:
+            cached = self._head
+        if not revalidate and cached and (
+            time.monotonic() - cached[2] < self.head_ttl or get_governor().under_pressure()
+        ):
+            return cached[0], cached[1]
+        commit_sha = self._request("GET", f"git/ref/heads/{self.branch}").json()["object"]["sha"]
+        tree_sha = self._request("GET", f"git/commits/{commit_sha}").json()["tree"]["sha"]
+        with self._lock:
+            self._head = (commit_sha, tree_sha, time.monotonic())
+        return commit_sha, tree_sha
+
+    def _tree(self, tree_sha):
+        """Map of path -> blob SHA for a tree (trees are immutable, so cached by SHA)."""
+        with self._lock:
+            tree = self._trees.get(tree_sha)
+        if tree is None:
+            body = self._request("GET", f"git/trees/{tree_sha}", params={"recursive": "1"}).json()
+            tree = {item["path"]: item["sha"] for item in body.get("tree", []) if item["type"] == "blob"}
+            with self._lock:
+                self._trees = {tree_sha: tree}
+        return tree
+
+    def read_blob(self, blob_sha):
+        """Decode a JSON blob, streaming the raw bytes straight into the parser."""
+        with self._lock:
+            if blob_sha in self._blobs:
+                return self._blobs[blob_sha]
+        response = self._request("GET", f"git/blobs/{blob_sha}", accept="application/vnd.github.raw", stream=True)
+        try:
+            response.raw.decode_content = True
+            data = json.load(response.raw)
+        except json.JSONDecodeError:
+            raise StorageError(f"Failed to decode blob {blob_sha}.")
+        finally:
+            response.close()
+        with self._lock:
+            if len(self._blobs) >= self.blob_cache_size:
+                self._blobs.pop(next(iter(self._blobs)))
+            self._blobs[blob_sha] = data
+        return data
+
+    def read_json(self, path, revalidate=False):
+        """Return ``(data, blob_sha)``, or ``(None, None)`` if the file does not exist."""
+        _, tree_sha = self.head(revalidate=revalidate)
+        blob_sha = self._tree(tree_sha).get(path)
+        if blob_sha is None:
+            return None, None
+        return self.read_blob(blob_sha), blob_sha
+
+    def iter_json(self, path):
+        """Yield the elements of a JSON array file, streaming blobs that are not cached."""
+        _, tree_sha = self.head(revalidate=False)
+        blob_sha = self._tree(tree_sha).get(path)
+        if blob_sha is None:
+            return
+        with self._lock:
+            cached = self._blobs.get(blob_sha)
+        if cached is not None:
+            yield from cached
+            return
+        response = self._request("GET", f"git/blobs/{blob_sha}", accept="application/vnd.github.raw", stream=True)
+        with response:
+            response.raw.decode_content = True
+            try:
+                yield from iter_json_array(response.raw)
+            except ValueError:
+                raise StorageError(f"Failed to decode blob {blob_sha}.")
+
+    def commit_files(self, files, message, expected=None, base=None):
+        """Write ``{path: data}`` as a single commit on the branch.
+
+        ``expected`` maps paths to the blob SHA each change was based on (``None``
+        for new files) and is checked against the head tree before anything is
+        written. ``base`` is the ``(commit_sha, tree_sha)`` the changes were read
+        from; losing the fast-forward race on the branch ref raises WriteConflict.
+        """
+        commit_sha, tree_sha = base or self.head()
+        if expected:
+            tree = self._tree(tree_sha)
+            for path, sha in expected.items():
+                if tree.get(path) != sha:
+                    raise WriteConflict(f"{path} changed while saving.")
+
+        entries = []
+        for path, data in files.items():
+            content = dump_json(data, self.indent)
+            blob = self._request("POST", "git/blobs", expected=(201,), json={"content": content, "encoding": "utf-8"})
+            entries.append({"path": path, "mode": "100644", "type": "blob", "sha": blob.json()["sha"]})
+
+        new_tree = self._request("POST", "git/trees", expected=(201,), json={"base_tree": tree_sha, "tree": entries})
+        commit = self._request("POST", "git/commits", expected=(201,), json={
+            "message": message, "tree": new_tree.json()["sha"], "parents": [commit_sha],
+        })
+        self._request("PATCH", f"git/refs/heads/{self.branch}", json={"sha": commit.json()["sha"], "force": False})
+        with self._lock:
+            self._head = (commit.json()["sha"], new_tree.json()["sha"], time.monotonic())
+        return {entry["path"]: entry["sha"] for entry in entries}
+
+    def update_files(self, updates, message):
+        """Apply ``{path: update(data)}`` to several files in one commit, retrying on conflicts."""
+        with self._write_lock:
+            return self._update_files(updates, message)
+
+    def _update_files(self, updates, message):
+        for attempt in range(self.max_retries + 1):
+            base = self.head()
+            tree = self._tree(base[1])
+            files = {}
+            for path, update in updates.items():
+                blob_sha = tree.get(path)
+                files[path] = update(self.read_blob(blob_sha) if blob_sha else None)
+            try:
+                shas = self.commit_files(files, message, base=base)
+            except WriteConflict:
+                SUBMIT_STATS.incr("conflicts")
+                if attempt == self.max_retries:
+                    SUBMIT_STATS.incr("failures")
+                    raise
+                SUBMIT_STATS.incr("retries")
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+            except StorageError:
+                SUBMIT_STATS.incr("failures")
+                raise
+            else:
+                SUBMIT_STATS.incr("writes")
+                return shas
+
+    def write_json(self, path, data, sha=None, message=None):
+        message = message or f"Update {os.path.basename(path)} with new responses"
+        return self.commit_files({path: data}, message, expected={path: sha})[path]
+
+    def update_json(self, path, update, message=None):
+        message = message or f"Update {os.path.basename(path)} with new responses"
+        return self.update_files({path: update}, message)[path]
+
+    def load(self, file_name):
+        data, _ = self.read_json(file_name)
+        return data or []
+
+    def iter_entries(self, file_name):
+        return self.iter_json(file_name)
+
+    def append(self, file_name, entry):
+        self.append_many(file_name, [entry])
+
+    def append_many(self, file_name, entries):
+        self.append_batches({file_name: entries})
+
+    def append_batches(self, batches):
+        count = sum(len(entries) for entries in batches.values())
+        names = ", ".join(os.path.basename(file_name) for file_name in batches)
+        updates = {
+            file_name: (lambda data, entries=entries: list(data or []) + list(entries))
+            for file_name, entries in batches.items()
+        }
+        self.update_files(updates, f"Update {names} with {count} new response{'s' if count != 1 else ''}")
@@ -0,0 +1,217 @@
+import os
+import json
+import threading
+from collections import defaultdict
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from respondents import RESPONDENT_CODE
+from scoring import SCORERS_BY_FILE
+from storage import LOCAL_DATA_DIR, DelegatingStore, StorageError, find_layer, get_store
+
+# Attempts averaged by the moving average
+WINDOW = 3
+
+
+class TrendStats:
+    """Latest score, change, moving average and least-squares slope of a score series.
+
+    Updated one attempt at a time: the slope is kept as running sums over
+    ``(attempt number, score)`` pairs, so adding an attempt is O(1) and never
+    revisits earlier ones.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.count = 0
+        self.latest = None
+        self.previous = None
+        self.recent = []
+        self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = 0
+
+    def add(self, score):
+        x = self.count
+        self.count += 1
+        self.sum_x += x
+        self.sum_y += score
+        self.sum_xx += x * x
+        self.sum_xy += x * score
+        self.previous, self.latest = self.latest, score
+        self.recent = (self.recent + [score])[-self.window:]
+
+    @property
+    def delta(self):
+        """Change from the previous attempt, or ``None`` after a single attempt."""
+        return None if self.previous is None else self.latest - self.previous
+
+    @property
+    def moving_average(self):
+        return sum(self.recent) / len(self.recent) if self.recent else None
+
+    @property
+    def slope(self):
+        """Least-squares score change per attempt, or ``None`` with fewer than two attempts."""
+        denominator = self.count * self.sum_xx - self.sum_x * self.sum_x
+        if self.count < 2 or not denominator:
+            return None
+        return (self.count * self.sum_xy - self.sum_x * self.sum_y) / denominator
+
+    def to_dict(self):
+        return {
+            "window": self.window, "count": self.count, "latest": self.latest, "previous": self.previous,
+            "recent": self.recent, "sum_x": self.sum_x, "sum_y": self.sum_y, "sum_xx": self.sum_xx,
+            "sum_xy": self.sum_xy,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        trend = cls(data["window"])
+        for field in ("count", "latest", "previous", "recent", "sum_x", "sum_y", "sum_xx", "sum_xy"):
+            setattr(trend, field, data[field])
+        return trend
+
+
+class HistoryStore(DelegatingStore):
+    """Keeps a score series and TrendStats per respondent and survey, updated on submit.
+
+    Each respondent's history lives in ``<root>/history/<respondent>.json`` as
+    ``{file_name: {"series": [[submitted_at, score], ...], "trend": {...}}}``,
+    so the history view reads one small file. A missing file is rebuilt from
+    ``find_respondent``, which goes through the respondent index when enabled;
+    if updating it after a submit fails, the file is dropped to be rebuilt.
+    """
+
+    def __init__(self, inner, root=LOCAL_DATA_DIR, window=WINDOW):
+        super().__init__(inner)
+        self.root = os.path.join(root, "history")
+        self.window = window
+        self._locks = defaultdict(threading.Lock)
+
+    def history_path(self, respondent):
+        if not RESPONDENT_CODE.fullmatch(respondent):
+            raise StorageError(f"Invalid respondent code `{respondent}`.")
+        return os.path.join(self.root, f"{respondent}.json")
+
+    def _read(self, respondent):
+        path = self.history_path(respondent)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, respondent, history):
+        path = self.history_path(respondent)
+        os.makedirs(self.root, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(history, f)
+        os.replace(path + ".tmp", path)
+
+    def _extend(self, history, file_name, entries):
+        survey = history.setdefault(file_name, {"series": [], "trend": TrendStats(self.window).to_dict()})
+        trend = TrendStats.from_dict(survey["trend"])
+        for entry in entries:
+            survey["series"].append([entry.get("submitted_at"), entry["score"]])
+            trend.add(entry["score"])
+        survey["trend"] = trend.to_dict()
+
+    def _rebuild(self, respondent):
+        history = {}
+        for file_name in SCORERS_BY_FILE:
+            found = self.inner.find_respondent(file_name, respondent)
+            if found:
+                self._extend(history, file_name, [entry for _, entry in found])
+        return history
+
+    def history(self, respondent):
+        """Return ``{file_name: (series, TrendStats)}`` for one respondent."""
+        with self._locks[respondent]:
+            history = self._read(respondent)
+            if history is None:
+                history = self._rebuild(respondent)
+                if history:
+                    self._write(respondent, history)
+        return {
+            file_name: (survey["series"], TrendStats.from_dict(survey["trend"]))
+            for file_name, survey in history.items()
+        }
+
+    def append_batches(self, batches):
+        self.inner.append_batches(batches)
+        by_respondent = defaultdict(lambda: defaultdict(list))
+        for file_name, entries in batches.items():
+            for entry in entries:
+                if entry.get("respondent"):
+                    by_respondent[entry["respondent"]][file_name].append(entry)
+        for respondent, surveys in by_respondent.items():
+            if not RESPONDENT_CODE.fullmatch(respondent):
+                continue
+            with self._locks[respondent]:
+                try:
+                    history = self._read(respondent)
+                    if history is None:
+                        # The entries just written are part of the rebuilt history.
+                        history = self._rebuild(respondent)
+                    else:
+                        for file_name, entries in surveys.items():
+                            self._extend(history, file_name, entries)
+                    self._write(respondent, history)
+                except (StorageError, OSError, ValueError):
+                    # The entries are saved; raising would get them submitted again.
+                    self._discard(respondent)
+
+    def _discard(self, respondent):
+        """Drop a respondent's history file so it is rebuilt on next view; caller holds their lock."""
+        try:
+            os.remove(self.history_path(respondent))
+        except OSError:
+            pass
+
+
+def load_history(respondent):
+    """A respondent's history from the HistoryStore, or straight from their entries if it is off."""
+    store = get_store()
+    histories = find_layer(store, "history")
+    if histories is not None:
+        return histories.history(respondent)
+    history = {}
+    for file_name in SCORERS_BY_FILE:
+        found = store.find_respondent(file_name, respondent)
+        if found:
+            trend = TrendStats()
+            for _, entry in found:
+                trend.add(entry["score"])
+            history[file_name] = ([[entry.get("submitted_at"), entry["score"]] for _, entry in found], trend)
+    return history
+
+
+def display_history(respondent, names):
+    """Score history and trend per survey; ``names`` maps display name -> data file."""
+    try:
+        history = load_history(respondent)
+    except StorageError as e:
+        st.error(f"Failed to fetch your history. {e}")
+        return
+    if not history:
+        return
+
+    st.subheader("📈 Your Progress")
+    rows = []
+    for name, file_name in names.items():
+        if file_name not in history:
+            continue
+        series, trend = history[file_name]
+        rows.extend(
+            {"Survey": name, "Attempt": attempt, "Submitted": submitted or "", "Score": score}
+            for attempt, (submitted, score) in enumerate(series, 1)
+        )
+        columns = st.columns(4)
+        columns[0].metric(f"{name}: Latest", trend.latest, delta=trend.delta)
+        columns[1].metric("Attempts", trend.count)
+        columns[2].metric(f"Average of Last {trend.window}", f"{trend.moving_average:.1f}")
+        columns[3].metric("Trend per Attempt", "–" if trend.slope is None else f"{trend.slope:+.1f}")
+
+    fig = px.line(
+        pd.DataFrame(rows), x="Attempt", y="Score", color="Survey", markers=True,
+        hover_data=["Submitted"], title="Scores per Attempt",
+    )
+    st.plotly_chart(fig, use_container_width=True)
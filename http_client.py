@@ -0,0 +1,77 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from settings import get_setting
+from rate_limit import get_governor
+
+# Defaults, overridable via the http_* settings
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 20
+POOL_SIZE = 16
+RETRIES = 3
+RETRY_BACKOFF = 0.3
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(pool_size=POOL_SIZE, retries=RETRIES, backoff=RETRY_BACKOFF):
+    """Create a keep-alive session with a bounded connection pool and retry policy.
+
+    Only idempotent methods are retried automatically (on connection errors and
+    5xx responses, honouring ``Retry-After``); PUT/POST conflicts are left to the
+    caller, which knows how to re-apply its change.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "User-Agent": "energyscan",
+    })
+    return session
+
+
+def get_session():
+    """Return the process-wide session shared by every GitHub call."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session(
+                pool_size=int(get_setting("http_pool_size", POOL_SIZE)),
+                retries=int(get_setting("http_retries", RETRIES)),
+                backoff=float(get_setting("http_retry_backoff", RETRY_BACKOFF)),
+            )
+        return _session
+
+
+def get_timeout():
+    """Return the ``(connect, read)`` timeout pair applied to every request."""
+    return (
+        float(get_setting("http_connect_timeout", CONNECT_TIMEOUT)),
+        float(get_setting("http_read_timeout", READ_TIMEOUT)),
+    )
+
+
+def request(method, url, timeout=None, **kwargs):
+    """Send a request through the shared session with the configured timeouts.
+
+    The rate-limit governor sees every call: it refuses to send one while the
+    budget is used up (raising ``RateLimited``) and reads the budget headers of
+    each response.
+    """
+    governor = get_governor()
+    governor.check()
+    response = get_session().request(method, url, timeout=timeout or get_timeout(), **kwargs)
+    governor.observe(response)
+    return response
@@ -0,0 +1,80 @@
+import json
+import codecs
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_NUMBER_TAIL = _WHITESPACE + "0123456789+-.eE"
+
+
+def _skip(buffer, pos, chars=_WHITESPACE):
+    while pos < len(buffer) and buffer[pos] in chars:
+        pos += 1
+    return pos
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    """Yield the elements of a top-level JSON array one at a time.
+
+    ``stream`` is any binary (UTF-8) or text file-like object with ``read``.
+    Only the element being parsed and at most one chunk are held in memory, so
+    peak memory is proportional to the largest entry rather than the file. An
+    empty stream yields nothing, like an empty survey file.
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer, pos, eof = "", 0, False
+    started = done = expect_comma = seen = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        if isinstance(chunk, bytes):
+            chunk = utf8.decode(chunk, final=eof)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    while True:
+        pos = _skip(buffer, pos)
+        if pos == len(buffer):
+            if eof:
+                break
+            fill()
+            continue
+        char = buffer[pos]
+        if done:
+            raise ValueError(f"Unexpected data after the JSON array: {char!r}")
+        if not started:
+            if char != "[":
+                raise ValueError(f"Expected a JSON array, found {char!r}")
+            started, pos = True, pos + 1
+        elif char == "]" and (expect_comma or not seen):
+            done, pos = True, pos + 1
+        elif expect_comma:
+            if char != ",":
+                raise ValueError(f"Expected ',' between array elements, found {char!r}")
+            expect_comma, pos = False, pos + 1
+        else:
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Probably cut off at the chunk boundary; read more and retry.
+                if eof:
+                    raise
+                fill()
+                continue
+            if not eof and _skip(buffer, end, _NUMBER_TAIL) == len(buffer):
+                # A number cut at the chunk boundary ("12" of "12.5") still parses.
+                fill()
+                continue
+            pos, expect_comma, seen = end, True, True
+            yield value
+    if started and not done:
+        raise ValueError("Unterminated JSON array")
+
+
+def iter_json_file(path, chunk_size=CHUNK_SIZE):
+    """Stream the entries of a JSON array file on disk."""
+    with open(path, "rb") as f:
+        yield from iter_json_array(f, chunk_size)
@@ -0,0 +1,110 @@
+import time
+import threading
+import requests
+from settings import get_setting
+
+# Remaining calls below which reads go stale-first and writes are queued
+RESERVE = 100
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+class RateLimited(requests.RequestException):
+    """Raised instead of sending a request while the rate-limit budget is used up."""
+
+
+class RateLimitGovernor:
+    """Tracks the GitHub API budget from the ``X-RateLimit-*`` headers of every response.
+
+    Shared by all threads. Once ``remaining`` drops to ``reserve`` the budget is
+    *under pressure*: stores serve cached reads even when stale and queue writes
+    on the write-behind spool. At zero (or after a 403/429 asking to back off)
+    requests are refused locally until the reset time, instead of spending a
+    round trip on a guaranteed error. The budget is assumed full again once the
+    reset time has passed.
+    """
+
+    def __init__(self, reserve=RESERVE):
+        self.reserve = reserve
+        self.limit = None
+        self.remaining = None
+        self.used = None
+        self.reset_at = None
+        self.resource = None
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "blocked": 0, "limited": 0}
+
+    def observe(self, response):
+        """Update the budget from a GitHub response."""
+        headers = response.headers
+        with self._lock:
+            self._stats["requests"] += 1
+            if "X-RateLimit-Remaining" in headers:
+                try:
+                    self.limit = int(headers.get("X-RateLimit-Limit", self.limit or 0))
+                    self.remaining = int(headers["X-RateLimit-Remaining"])
+                    self.used = int(headers.get("X-RateLimit-Used", self.used or 0))
+                    self.reset_at = int(headers.get("X-RateLimit-Reset", self.reset_at or 0)) or None
+                except ValueError:
+                    pass
+                self.resource = headers.get("X-RateLimit-Resource", self.resource)
+            # Secondary limits answer 403/429 with Retry-After instead of a zero budget.
+            if response.status_code in (403, 429) and (self.remaining == 0 or "Retry-After" in headers):
+                self._stats["limited"] += 1
+                self.remaining = 0
+                retry_after = headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    self.reset_at = max(self.reset_at or 0, int(time.time()) + int(retry_after))
+
+    def _refresh(self):
+        # Caller holds the lock.
+        if self.reset_at is not None and time.time() >= self.reset_at:
+            self.remaining, self.used, self.reset_at = self.limit, 0, None
+
+    def under_pressure(self):
+        """True while the remaining budget is at or below the reserve."""
+        with self._lock:
+            self._refresh()
+            return self.remaining is not None and self.remaining <= self.reserve
+
+    def exhausted(self):
+        with self._lock:
+            self._refresh()
+            return self.remaining == 0
+
+    def check(self):
+        """Raise RateLimited if no calls are left before the reset."""
+        with self._lock:
+            self._refresh()
+            if self.remaining != 0:
+                return
+            self._stats["blocked"] += 1
+            wait = max(0, int((self.reset_at or time.time()) - time.time()))
+        raise RateLimited(f"GitHub API rate limit reached; try again in {wait} s.")
+
+    def snapshot(self):
+        """Budget, reset time and counters for the admin page."""
+        with self._lock:
+            self._refresh()
+            data = {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "used": self.used,
+                "reset_at": self.reset_at,
+                "resets_in": None if self.reset_at is None else max(0, int(self.reset_at - time.time())),
+                "resource": self.resource,
+                "reserve": self.reserve,
+                **self._stats,
+            }
+        data["under_pressure"] = data["remaining"] is not None and data["remaining"] <= self.reserve
+        return data
+
+
+def get_governor():
+    """Return the process-wide governor shared by every GitHub call."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = RateLimitGovernor(reserve=int(get_setting("rate_limit_reserve", RESERVE)))
+        return _governor
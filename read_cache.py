@@ -0,0 +1,123 @@
+import time
+import threading
+
+
+class CacheEntry:
+    """A decoded file together with the version information needed to revalidate it."""
+
+    __slots__ = ("data", "sha", "etag", "fetched_at")
+
+    def __init__(self, data, sha, etag, fetched_at):
+        self.data = data
+        self.sha = sha
+        self.etag = etag
+        self.fetched_at = fetched_at
+
+
+class ReadCache:
+    """Process-wide cache of decoded survey files, keyed by repository path.
+
+    Entries younger than ``ttl`` seconds are served without any request. Older
+    entries keep their ``ETag`` so the caller can revalidate with
+    ``If-None-Match``; a ``304 Not Modified`` then costs neither a download nor
+    a JSON parse. Cached data is shared between sessions and must be treated
+    as read-only.
+
+    Every write or invalidation bumps a generation counter. A reader takes
+    ``generation()`` before its request and passes it to ``put``, so a download
+    that started before a write cannot replace the newer entry.
+    """
+
+    def __init__(self, ttl=30.0):
+        self.ttl = ttl
+        self._entries = {}
+        self._generation = 0
+        self._changed = {}
+        self._cleared = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale": 0, "revalidated": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, path):
+        """Return the cached entry for ``path`` regardless of age, or ``None``."""
+        with self._lock:
+            return self._entries.get(path)
+
+    def get_fresh(self, path):
+        """Return the cached entry if it is younger than the TTL, counting a hit."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and time.monotonic() - entry.fetched_at < self.ttl:
+                self._stats["hits"] += 1
+                return entry
+            return None
+
+    def get_stale(self, path):
+        """Return the cached entry whatever its age, counting a stale hit (used to save API calls)."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._stats["stale"] += 1
+            return entry
+
+    def generation(self):
+        """The current generation, to pass to ``put`` for a request started now."""
+        with self._lock:
+            return self._generation
+
+    def _bump(self, path):
+        # Caller holds the lock.
+        self._generation += 1
+        if path is None:
+            self._cleared = self._generation
+        else:
+            self._changed[path] = self._generation
+
+    def put(self, path, data, sha, etag=None, generation=None):
+        """Cache a freshly downloaded file, counting a miss.
+
+        With ``generation``, the entry is not stored if ``path`` was written or
+        invalidated since then.
+        """
+        with self._lock:
+            self._stats["misses"] += 1
+            if generation is not None and max(self._changed.get(path, 0), self._cleared) > generation:
+                return
+            self._entries[path] = CacheEntry(data, sha, etag, time.monotonic())
+
+    def written(self, path, data, sha):
+        """Replace an entry with content this process just wrote.
+
+        The new content has no ETag yet, so once the TTL expires the next read is a
+        full download rather than a revalidation.
+        """
+        with self._lock:
+            self._entries[path] = CacheEntry(data, sha, None, time.monotonic())
+            self._bump(path)
+
+    def revalidated(self, path):
+        """Mark an entry as confirmed unchanged by a ``304`` response."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                entry.fetched_at = time.monotonic()
+            self._stats["revalidated"] += 1
+            return entry
+
+    def invalidate(self, path=None):
+        """Drop one path, or everything when ``path`` is ``None``."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+            self._bump(path)
+            self._stats["invalidations"] += 1
+
+    def stats(self):
+        """Return hit/miss counters plus the hit ratio over all lookups."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["stale"] + stats["revalidated"] + stats["misses"]
+        stats["hit_ratio"] = (stats["hits"] + stats["stale"] + stats["revalidated"]) / lookups if lookups else 0.0
+        return stats
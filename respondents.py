@@ -0,0 +1,210 @@
+import os
+import re
+import copy
+import sys
+import json
+import uuid
+import threading
+import streamlit as st
+from collections import defaultdict
+from settings import get_setting
+from scoring import SCORERS_BY_FILE
+from storage import LOCAL_DATA_DIR, DelegatingStore, StorageError, find_layer
+
+
+# Respondent codes: generated ones are 12 hex digits, typed ones are lowercased first
+RESPONDENT_CODE = re.compile(r"[0-9a-z_-]{1,64}")
+
+
+def normalize_code(code):
+    """A typed respondent code in canonical form, or ``None`` if it is not a valid code."""
+    code = code.strip().lower()
+    return code if RESPONDENT_CODE.fullmatch(code) else None
+
+
+def _index_line(respondent, file_name, position):
+    return json.dumps({"respondent": respondent, "file": file_name, "position": position})
+
+
+def respondent_id():
+    """This browser session's respondent code, created on first use."""
+    if "respondent_id" not in st.session_state:
+        st.session_state["respondent_id"] = uuid.uuid4().hex[:12]
+    return st.session_state["respondent_id"]
+
+
+def attempt_id(file_name, responses):
+    """This session's nonce for its current attempt at a survey.
+
+    An attempt lasts until it is saved and its answers then change, or until
+    ``next_attempt``. Submitting the same answers again in between (a second
+    click, a rerun, a retry after a failed save) reuses the nonce, so the repeat
+    has the same idempotency key and is written once.
+    """
+    attempts = st.session_state.setdefault("attempts", {})
+    attempt = attempts.get(file_name)
+    if attempt is None or (attempt["saved"] is not None and attempt["saved"] != responses):
+        attempt = attempts[file_name] = {"nonce": uuid.uuid4().hex[:8], "saved": None}
+    return attempt["nonce"]
+
+
+def attempt_saved(file_name, responses):
+    """Record the answers the current attempt was saved with; changing them starts the next one."""
+    attempt = st.session_state.setdefault("attempts", {}).get(file_name)
+    if attempt is not None:
+        attempt["saved"] = copy.deepcopy(responses)
+
+
+def next_attempt(file_name):
+    """Start over explicitly, so a retake with unchanged answers is saved as well."""
+    st.session_state.setdefault("attempts", {}).pop(file_name, None)
+
+
+class RespondentIndexStore(DelegatingStore):
+    """Maintains an index from respondent to entry positions across all surveys.
+
+    Every append records ``{"respondent", "file", "position"}`` lines in the
+    append-only ``<root>/respondents.jsonl``, so ``find_respondent`` fetches a person's
+    entries with ``get_entry`` instead of scanning every survey. Positions are
+    verified on lookup; a stale one falls back to the backend's own search and
+    the index is repaired. A missing index is built from the surveys on first
+    use, and one that could not be updated after a submit (say, while the
+    backend is down) is dropped to be rebuilt; run ``python respondents.py`` to
+    rebuild it after other processes or tools wrote entries.
+    """
+
+    def __init__(self, inner, root=LOCAL_DATA_DIR):
+        super().__init__(inner)
+        self.path = os.path.join(root, "respondents.jsonl")
+        self._index = None
+        self._lock = threading.Lock()
+        self._file_locks = defaultdict(threading.Lock)
+
+    def _scan(self, file_names):
+        """Build ``(index, lines)`` from the stored entries of ``file_names``."""
+        index = defaultdict(lambda: defaultdict(list))
+        lines = []
+        for file_name in file_names:
+            for position, entry in enumerate(self.inner.iter_entries(file_name)):
+                if entry.get("respondent"):
+                    index[entry["respondent"]][file_name].append(position)
+                    lines.append(_index_line(entry["respondent"], file_name, position))
+        return index, lines
+
+    def _write(self, lines):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            f.writelines(line + "\n" for line in lines)
+        os.replace(self.path + ".tmp", self.path)
+
+    def _load_index(self):
+        """Respondent -> file -> positions, scanned from the surveys if missing; caller holds the lock."""
+        if self._index is None:
+            if not os.path.exists(self.path):
+                self._index, lines = self._scan(SCORERS_BY_FILE)
+                self._write(lines)
+                return self._index
+            self._index = defaultdict(lambda: defaultdict(list))
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        record = json.loads(line)
+                        self._index[record["respondent"]][record["file"]].append(record["position"])
+        return self._index
+
+    def _record(self, records):
+        records = list(records)
+        if not records:
+            return
+        with self._lock:
+            index = self._load_index()
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                for respondent, file_name, position in records:
+                    positions = index[respondent][file_name]
+                    if position not in positions:
+                        positions.append(position)
+                        f.write(_index_line(respondent, file_name, position) + "\n")
+
+    def append_batches(self, batches):
+        # Hold each survey's lock across append + count so the new entries are the last ones.
+        locks = [self._file_locks[file_name] for file_name in sorted(batches)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            self.inner.append_batches(batches)
+            records = []
+            try:
+                for file_name, entries in batches.items():
+                    if not any(entry.get("respondent") for entry in entries):
+                        continue
+                    first = self.inner.count(file_name) - len(entries)
+                    records.extend(
+                        (entry["respondent"], file_name, first + offset)
+                        for offset, entry in enumerate(entries) if entry.get("respondent")
+                    )
+            except StorageError:
+                # Saved (or queued while the backend is down), but the positions are unknown.
+                records = None
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        # The entries are saved, so failing now would get them submitted again.
+        if records is not None:
+            try:
+                self._record(records)
+                return
+            except (StorageError, OSError):
+                pass
+        self._discard()
+
+    def _discard(self):
+        """Drop the index after a failed update; it is rebuilt from the surveys on next use."""
+        with self._lock:
+            self._index = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def find_respondent(self, file_name, respondent):
+        with self._lock:
+            positions = list(self._load_index().get(respondent, {}).get(file_name, ()))
+        found = []
+        for position in positions:
+            try:
+                entry = self.inner.get_entry(file_name, position)
+            except IndexError:
+                break
+            if entry.get("respondent") != respondent:
+                break
+            found.append((position, entry))
+        else:
+            return found
+        found = self.inner.find_respondent(file_name, respondent)
+        self._record((respondent, file_name, position) for position, _ in found)
+        return found
+
+    def rebuild_index(self, file_names=SCORERS_BY_FILE):
+        """Recreate the index by scanning ``file_names``; returns the number of indexed entries."""
+        index, lines = self._scan(file_names)
+        with self._lock:
+            self._write(lines)
+            self._index = index
+        return len(lines)
+
+
+def main():
+    """Rebuild the respondent index from every survey file."""
+    from result import FILES
+    from storage import get_store
+
+    store = find_layer(get_store(), "rebuild_index")
+    if store is None:
+        store = RespondentIndexStore(get_store(), get_setting("local_data_dir", LOCAL_DATA_DIR))
+    print(f"Indexed {store.rebuild_index(FILES.values())} entries in {store.path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
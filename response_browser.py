@@ -0,0 +1,107 @@
+from datetime import timedelta
+import streamlit as st
+from storage import StorageError, get_store
+
+# Responses listed per page
+PAGE_SIZE = 10
+
+
+def classification_band(scorer, label):
+    """Inclusive ``(min_score, max_score)`` of a classification; ``None`` means unbounded."""
+    index = scorer.labels.index(label)
+    low = scorer.thresholds[index] if index > 0 else None
+    high = scorer.thresholds[index + 1] - 1 if index + 1 < len(scorer.labels) else None
+    return low, high
+
+
+def _tighten(bound, other, pick):
+    return other if bound is None else bound if other is None else pick(bound, other)
+
+
+def _filters(file_name, scorer, key):
+    """Render the filter controls and return them as ``ResponseStore.query`` arguments."""
+    filters = {"min_score": None, "max_score": None, "since": None, "until": None}
+    with st.expander("🔎 Filter responses"):
+        columns = st.columns(2)
+        label = columns[0].selectbox(
+            "Classification", ["All"] + list(reversed(scorer.labels)), key=f"{key}_classification"
+        )
+        if label != "All":
+            filters["min_score"], filters["max_score"] = classification_band(scorer, label)
+
+        summary = get_store().summary(file_name)
+        if summary["count"] and summary["min"] < summary["max"]:
+            low, high = columns[1].slider(
+                "Score range", summary["min"], summary["max"], (summary["min"], summary["max"]), key=f"{key}_scores"
+            )
+            if low > summary["min"]:
+                filters["min_score"] = _tighten(filters["min_score"], low, max)
+            if high < summary["max"]:
+                filters["max_score"] = _tighten(filters["max_score"], high, min)
+
+        columns = st.columns(2)
+        since = columns[0].date_input("Submitted from", value=None, key=f"{key}_since")
+        until = columns[1].date_input("Submitted until", value=None, key=f"{key}_until")
+        if since:
+            filters["since"] = since.isoformat()
+        if until:
+            filters["until"] = (until + timedelta(days=1)).isoformat()
+    return filters
+
+
+def _turn_page(key, cursor):
+    cursors = st.session_state[f"{key}_cursors"]
+    if cursor is None:
+        cursors.pop()
+    else:
+        cursors.append(cursor)
+    st.session_state.pop(f"{key}_choice", None)
+
+
+def browse_responses(file_name, scorer, key, page_size=PAGE_SIZE):
+    """Filterable, paginated list of a survey's responses; returns the chosen entry.
+
+    Only one page (plus one entry to detect a next page) is fetched per run.
+    Pages are keyed by the last position shown, so the store seeks instead of
+    counting past earlier pages; the stack of those cursors lives in session
+    state so "Previous" works without re-scanning.
+    """
+    try:
+        filters = _filters(file_name, scorer, key)
+    except StorageError as e:
+        st.error(f"Failed to fetch data. {e}")
+        return None
+
+    if st.session_state.get(f"{key}_filters") != filters:
+        st.session_state[f"{key}_filters"] = filters
+        st.session_state[f"{key}_cursors"] = [None]
+        st.session_state.pop(f"{key}_choice", None)
+    cursors = st.session_state[f"{key}_cursors"]
+
+    try:
+        page = get_store().query(file_name, after=cursors[-1], limit=page_size + 1, **filters)
+    except StorageError as e:
+        st.error(f"Failed to fetch responses. {e}")
+        return None
+    has_next = len(page) > page_size
+    page = dict(page[:page_size])
+    if not page:
+        st.info("No responses match these filters.")
+        return None
+
+    def describe(position):
+        entry = page[position]
+        submitted = (entry.get("submitted_at") or "")[:10] or "no date"
+        return f"#{position + 1} · score {entry['score']} · {submitted}"
+
+    position = st.radio("Choose a response:", list(page), format_func=describe, key=f"{key}_choice")
+
+    columns = st.columns([1, 1, 3])
+    columns[0].button(
+        "← Previous", key=f"{key}_previous", disabled=len(cursors) == 1, on_click=_turn_page, args=(key, None)
+    )
+    columns[1].button(
+        "Next →", key=f"{key}_next", disabled=not has_next, on_click=_turn_page, args=(key, max(page))
+    )
+    columns[2].caption(f"Page {len(cursors)}")
+    return page[position]
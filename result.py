@@ -1,13 +1,13 @@
+import time
 import streamlit as st
-import json
-import requests
-import base64
 import pandas as pd
 import plotly.express as px
-
-# Constants for GitHub integration
-GITHUB_USER = "hawkarabdulhaq"
-GITHUB_REPO = "energyscan"
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from cohort import top_percent
+from history import display_history
+from respondents import normalize_code, respondent_id
+from settings import get_setting
+from storage import StorageError, get_store
 
 FILES = {
     "Awareness": "data/awareness.json",
@@ -16,38 +16,54 @@ FILES = {
     "Activities": "data/activities.json",
 }
 
-def get_github_pat():
-    """Retrieve GitHub PAT from Streamlit secrets."""
+
+def fetch_all(fetch, timeout=None):
+    """Run ``fetch(store, file_name)`` for all surveys concurrently.
+
+    Returns ``(results, failures)``. A survey that errors or takes longer than
+    ``timeout`` seconds ends up in ``failures`` so the page can render the rest.
+    Each call gets its own pool, so one session's slow fetches never queue
+    another session's behind them.
+    """
+    if timeout is None:
+        timeout = float(get_setting("fetch_timeout", 10))
     try:
-        return st.secrets["github_pat"]
-    except KeyError:
-        st.error("GitHub PAT not found in secrets! Please add `github_pat` to your secrets.")
-        return None
+        store = get_store()
+    except StorageError as e:
+        return {}, {category: str(e) for category in FILES}
+
+    executor = ThreadPoolExecutor(max_workers=len(FILES), thread_name_prefix="results-fetch")
+    futures = {category: executor.submit(fetch, store, file_name) for category, file_name in FILES.items()}
+    deadline = time.monotonic() + timeout
+    results, failures = {}, {}
+    try:
+        for category, future in futures.items():
+            try:
+                results[category] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except TimeoutError:
+                failures[category] = f"no response within {timeout:g} seconds"
+            except Exception as e:
+                # Any error in one survey must not take down the others.
+                failures[category] = str(e) or type(e).__name__
+    finally:
+        # Don't wait for fetches that missed the deadline; their threads end when they return.
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results, failures
 
 
-def load_data(file_name):
-    """Load data from GitHub repository."""
-    github_pat = get_github_pat()
-    if not github_pat:
-        return []
+def load_summaries(timeout=None):
+    """Load score aggregates for all surveys concurrently; returns ``(summaries, failures)``."""
+    return fetch_all(lambda store, file_name: store.summary(file_name), timeout)
 
-    url = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/contents/{file_name}"
-    headers = {"Authorization": f"token {github_pat}"}
-    response = requests.get(url, headers=headers)
 
-    if response.status_code == 200:
-        content = response.json().get("content", "")
-        if content:
-            try:
-                return json.loads(base64.b64decode(content).decode("utf-8"))
-            except json.JSONDecodeError:
-                st.error(f"Failed to decode {file_name}. Returning an empty list.")
-                return []
-    elif response.status_code == 404:
-        return []
-    else:
-        st.error(f"Failed to fetch {file_name}. Error {response.status_code}: {response.text}")
-        return []
+def load_respondent_scores(respondent, timeout=None):
+    """Latest score per survey for one respondent, looked up through the respondent index.
+
+    Returns ``(scores, failures)``; surveys the respondent has not taken are left out.
+    """
+    found, failures = fetch_all(lambda store, file_name: store.find_respondent(file_name, respondent), timeout)
+    scores = {category: entries[-1][1]["score"] for category, entries in found.items() if entries}
+    return scores, failures
 
 
 def categorize_user(total_score):
@@ -64,22 +80,44 @@ def display_results():
     st.title("📈 Results Dashboard")
     st.markdown("**Here’s a summary of your energy performance across all surveys.**")
 
-    # Load data from all JSON files
-    results = {}
-    for category, file_name in FILES.items():
-        data = load_data(file_name)
-        scores = [entry["score"] for entry in data] if data else [0]
-        results[category] = sum(scores) / len(scores) if scores else 0
+    # Who is looking: this session's respondent code, or one from an earlier visit
+    respondent = respondent_id()
+    st.caption(f"Your respondent code is `{respondent}`. Enter it here on a later visit to see these results again.")
+    with st.expander("Returning? Enter your respondent code"):
+        typed = st.text_input("Respondent code:", key="respondent_code")
+        code = normalize_code(typed)
+        if typed.strip() and code is None:
+            st.error("A respondent code can only contain letters, digits, `-` and `_`.")
+        elif code and code != respondent:
+            st.session_state["respondent_id"] = respondent = code
+
+    # Fetch this respondent's own entries in parallel via the respondent index
+    results, failures = load_respondent_scores(respondent)
+    personal = bool(results)
+    if not personal:
+        # Nothing submitted yet: fall back to the averages across all respondents
+        summaries, failures = load_summaries()
+        results = {category: summaries[category]["mean"] for category in FILES if category in summaries}
+    for category, reason in failures.items():
+        st.warning(f"{category} results are unavailable right now ({reason}).")
+    if not results:
+        st.error("Failed to load any survey results. Please try again later.")
+        return
+    if not personal:
+        st.info("You have not submitted any surveys yet, so these are the averages across all respondents.")
+    missing = [category for category in FILES if category not in results and category not in failures]
+    if personal and missing:
+        st.info(f"Complete the {', '.join(missing)} survey(s) to see your full results.")
 
     # Calculate total and average scores
     total_score = sum(results.values())
-    avg_score = total_score / len(FILES)
+    avg_score = total_score / len(results)
 
     # Categorize user
     category, message = categorize_user(total_score)
 
     # Display overall results
-    st.subheader("📊 Your Overall Performance")
+    st.subheader("📊 Your Overall Performance" if personal else "📊 Overall Performance (All Respondents)")
     st.metric("Total Score", f"{total_score} / 200")
     st.metric("Average Score", f"{avg_score:.2f} / 50")
     st.info(f"**Category:** {category}\n\n{message}")
@@ -90,6 +128,19 @@ def display_results():
     fig = px.bar(score_df, x="Survey", y="Score", title="Scores by Survey", color="Survey", text="Score")
     st.plotly_chart(fig, use_container_width=True)
 
+    # Where this respondent's latest scores rank among everyone's
+    if personal:
+        st.subheader("📍 Where You Stand")
+        columns = st.columns(len(results))
+        for column, (category, score) in zip(columns, results.items()):
+            column.metric(category, score, help="Your latest score in this survey")
+            top = top_percent(FILES[category], score)
+            if top is not None:
+                column.caption(f"Top {top}% for {category}")
+
+        # How this respondent's scores moved over their repeat attempts
+        display_history(respondent, FILES)
+
     # Strengths and improvement areas
     st.subheader("✅ Strengths and Opportunities")
     strengths = [f"- **{survey}**: Excellent score of {score}" for survey, score in results.items() if score >= 40]
@@ -1,84 +1,19 @@
 import streamlit as st
-import json
-import requests
-import base64
+from scoring import ROUTINE
+from storage import StorageError, get_store, new_entry
+from respondents import attempt_id, attempt_saved, next_attempt, respondent_id
 
-# Constants for GitHub integration
-GITHUB_USER = "hawkarabdulhaq"
-GITHUB_REPO = "energyscan"
-JSON_FILE = "data/routine.json"
-GITHUB_API_URL_JSON = f"https://api.github.com/repos/{GITHUB_USER}/{GITHUB_REPO}/contents/{JSON_FILE}"
+JSON_FILE = ROUTINE.file
 
 
-def get_github_pat():
-    """Retrieve GitHub PAT from Streamlit secrets."""
+def save_results(data):
+    """Append a submission to the configured response store."""
     try:
-        return st.secrets["github_pat"]
-    except KeyError:
-        st.error("GitHub PAT not found in secrets! Please add `github_pat` to your secrets.")
-        return None
-
-
-def load_existing_data():
-    """Load existing data from the GitHub repository."""
-    github_pat = get_github_pat()
-    if not github_pat:
-        return []
-
-    headers = {"Authorization": f"token {github_pat}"}
-    response = requests.get(GITHUB_API_URL_JSON, headers=headers)
-
-    if response.status_code == 200:
-        content = response.json().get("content", "")
-        if content:
-            try:
-                return json.loads(base64.b64decode(content).decode("utf-8"))
-            except json.JSONDecodeError:
-                st.error("Failed to decode existing data. Initializing as an empty list.")
-                return []
-    elif response.status_code == 404:
-        st.warning("No existing data found. A new file will be created.")
-        return []
-    else:
-        st.error(f"Failed to fetch data from GitHub. Error {response.status_code}: {response.text}")
-        return []
-
-
-def save_results_to_github(data):
-    """Save or update data in the GitHub repository."""
-    github_pat = get_github_pat()
-    if not github_pat:
-        return
-
-    existing_data = load_existing_data()
-    existing_data.append(data)
-
-    headers = {
-        "Authorization": f"token {github_pat}",
-        "Accept": "application/vnd.github.v3+json",
-    }
-
-    # Encode content and prepare payload
-    encoded_content = base64.b64encode(json.dumps(existing_data, indent=4).encode("utf-8")).decode("utf-8")
-    commit_message = "Update routine.json with new responses"
-
-    # Get the SHA of the existing file (if exists)
-    sha = None
-    response = requests.get(GITHUB_API_URL_JSON, headers=headers)
-    if response.status_code == 200:
-        sha = response.json().get("sha", None)
-
-    payload = {"message": commit_message, "content": encoded_content}
-    if sha:
-        payload["sha"] = sha
-
-    # Save the updated file
-    save_response = requests.put(GITHUB_API_URL_JSON, headers=headers, json=payload)
-
-    if save_response.status_code in [200, 201]:
-        st.success("Results successfully saved to GitHub!")
-    else:
-        st.error(f"Failed to save results to GitHub. Error {save_response.status_code}: {save_response.text}")
+        get_store().append(JSON_FILE, data)
+    except StorageError as e:
+        st.error(f"Failed to save results. {e}")
+        return False
+    return True
 
 
 def routine_test():
@@ -165,15 +100,9 @@ def routine_test():
     # Submit Button
     if st.button("Submit Test", key="routine_submit"):
         responses = st.session_state["routine_responses"]
-        score = 0
-        score += 4 if responses["q1"] == "Yes" else 2
-        score += responses["q2"]
-        score += responses["q3"]
-        strategy_scores = {"A. Prioritize tasks.": 4, "B. Delegate tasks.": 3, "C. Reschedule activities.": 2, "D. Skip low-priority tasks.": 1}
-        score += sum(strategy_scores[strategy] for strategy in responses["q4"])
-        score += 4 if responses["q5"] == "Yes" else 2
-        score += responses["q6"]
-        score += 4 if responses["q7"] == "Yes" else 2
+        score = ROUTINE.score(responses)
 
-        save_results_to_github({"score": score, "responses": responses})
-        st.success("Your results have been saved successfully!")
+        if save_results(new_entry(score, responses, respondent_id(), attempt_id(JSON_FILE, responses))):
+            attempt_saved(JSON_FILE, responses)
+            st.success("Your results have been saved successfully!")
+            st.button("Start a New Attempt", key="routine_retake", on_click=next_attempt, args=(JSON_FILE,))
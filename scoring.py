@@ -0,0 +1,195 @@
+from bisect import bisect_right
+
+# Question types
+RADIO = "radio"
+SLIDER = "slider"
+CHECKBOX = "checkbox"
+MULTISELECT = "multiselect"
+
+YES_NO = {"Yes": 4, "No": 2}
+FREQUENCY = {"Always": 4, "Often": 3, "Rarely": 2, "Never": 1}
+
+# Scoring specifications: question -> option -> points, plus classification
+# thresholds as (minimum score, label), highest first. Sliders score their value,
+# radios and checkboxes the points of the chosen option, multiselects the sum of
+# the points of every chosen option. Options are listed in the order the survey
+# shows them.
+SPECS = {
+    "awareness": {
+        "file": "data/awareness.json",
+        "questions": {
+            "q1": {"type": RADIO, "options": YES_NO},
+            "q2": {"type": SLIDER, "min": 1, "max": 5},
+            "q3": {"type": RADIO, "options": {
+                "A. Through regular tracking or journaling.": 4,
+                "B. Occasionally reflect on energy levels.": 3,
+                "C. Only notice during extreme highs/lows.": 2,
+                "D. Rarely think about energy levels.": 1,
+            }},
+            "q4": {"type": SLIDER, "min": 1, "max": 5},
+            "q5": {"type": MULTISELECT, "options": {
+                "A. Adjust tasks to match energy levels.": 4,
+                "B. Take a short break or recharge.": 3,
+                "C. Push through regardless.": 2,
+                "D. Delay tasks until later.": 1,
+            }},
+            "q6": {"type": RADIO, "options": YES_NO},
+            "q7": {"type": SLIDER, "min": 1, "max": 5},
+            "q8": {"type": RADIO, "options": YES_NO},
+            "q9": {"type": SLIDER, "min": 1, "max": 5},
+        },
+        "classes": [
+            (35, "🎯 Prioritizes essential, goal-oriented activities with clear impact."),
+            (28, "✅ Focuses on impactful tasks most of the time but occasionally gets sidetracked."),
+            (20, "⚠️ Mixes impactful and trivial tasks, leading to diluted results."),
+            (0, "❌ Focuses primarily on low-value tasks; lacks clarity on priorities."),
+        ],
+    },
+    "routine": {
+        "file": "data/routine.json",
+        "questions": {
+            "q1": {"type": RADIO, "options": YES_NO},
+            "q2": {"type": SLIDER, "min": 1, "max": 5},
+            "q3": {"type": SLIDER, "min": 1, "max": 5},
+            "q4": {"type": MULTISELECT, "options": {
+                "A. Prioritize tasks.": 4,
+                "B. Delegate tasks.": 3,
+                "C. Reschedule activities.": 2,
+                "D. Skip low-priority tasks.": 1,
+            }},
+            "q5": {"type": RADIO, "options": YES_NO},
+            "q6": {"type": SLIDER, "min": 1, "max": 5},
+            "q7": {"type": RADIO, "options": YES_NO},
+        },
+        "classes": [
+            (35, "🎯 Highly consistent and adaptable routines with a focus on self-care and improvement."),
+            (28, "✅ Good routine management but with room for better adaptability and self-care."),
+            (20, "⚠️ Mixed routines, with gaps in consistency and self-care."),
+            (0, "❌ Lacks consistent routines and adaptability; needs significant improvements."),
+        ],
+    },
+    "wellbeing": {
+        "file": "data/wellbeing.json",
+        "questions": {
+            "q1": {"type": RADIO, "options": YES_NO},
+            "q2": {"type": RADIO, "options": YES_NO},
+            "q3": {"type": SLIDER, "min": 1, "max": 5},
+            "q4": {"type": RADIO, "options": YES_NO},
+            "q5": {"type": RADIO, "options": {
+                "Rarely, I manage my mental energy well.": 4,
+                "Occasionally, but it’s manageable.": 3,
+                "Frequently, it impacts my productivity.": 2,
+                "Almost always, I feel exhausted.": 1,
+            }},
+            "q6": {"type": SLIDER, "min": 1, "max": 5},
+            "q7": {"type": MULTISELECT, "options": {
+                "A. Weekly family meetups.": 2,
+                "B. Socializing with friends.": 2,
+                "C. Community or volunteering work.": 2,
+                "D. Online groups or chats.": 2,
+            }},
+            "q8": {"type": SLIDER, "min": 1, "max": 5},
+            "q9": {"type": RADIO, "options": YES_NO},
+        },
+        "classes": [
+            (40, "🎯 Excellent balance and self-care practices."),
+            (30, "✅ Good well-being practices but room for improvement."),
+            (20, "⚠️ Moderate well-being, with gaps in self-care and social connections."),
+            (0, "❌ Needs significant improvements in work-life balance and self-care."),
+        ],
+    },
+    "activities": {
+        "file": "data/activities.json",
+        "questions": {
+            "q1": {"type": RADIO, "options": FREQUENCY},
+            "q2": {"type": CHECKBOX, "options": {True: 4, False: 2}},
+            "q3": {"type": SLIDER, "min": 1, "max": 5},
+            "q4": {"type": RADIO, "options": YES_NO},
+            "q5": {"type": MULTISELECT, "options": {
+                "Write down expected outcomes for each task.": 4,
+                "Compare task outcomes with goals.": 3,
+                "Use a decision-making framework.": 2,
+                "Complete tasks randomly without evaluation.": 1,
+            }},
+            "q6": {"type": RADIO, "options": FREQUENCY},
+            "q7": {"type": SLIDER, "min": 1, "max": 5},
+        },
+        "classes": [
+            (40, "🎯 Excellent task prioritization and focus."),
+            (30, "✅ Good practices but room for optimization."),
+            (20, "⚠️ Moderate task management, with opportunities to improve focus."),
+            (0, "❌ Significant improvements needed in task prioritization and productivity."),
+        ],
+    },
+}
+
+
+class CompiledScorer:
+    """A survey's scoring spec flattened into lookup tables.
+
+    Built once at import; ``score`` is a single pass over precomputed
+    ``(question, kind, table)`` steps with dict lookups, and ``classify_score``
+    is a binary search over the class thresholds. Unknown answers score 0.
+    """
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.file = spec["file"]
+        self.questions = spec["questions"]
+        self.options = {
+            question: tuple(q["options"]) for question, q in self.questions.items() if "options" in q
+        }
+        self.option_index = {
+            question: {option: i for i, option in enumerate(options)} for question, options in self.options.items()
+        }
+        self._points = {
+            question: dict(q["options"]) for question, q in self.questions.items() if "options" in q
+        }
+        self._steps = tuple(
+            (question, q["type"], self._points.get(question)) for question, q in self.questions.items()
+        )
+
+        classes = sorted(spec["classes"])
+        self.thresholds = tuple(minimum for minimum, _ in classes)
+        self.labels = tuple(label for _, label in classes)
+
+    def points(self, question, answer):
+        """Points for one answer; multiselect answers score the sum of their options."""
+        table = self._points[question]
+        if isinstance(answer, list):
+            return sum(table.get(option, 0) for option in answer)
+        return table.get(answer, 0)
+
+    def score(self, responses):
+        total = 0
+        for question, kind, table in self._steps:
+            answer = responses.get(question)
+            if kind == SLIDER:
+                total += int(answer)
+            elif kind == MULTISELECT:
+                for option in answer or ():
+                    total += table.get(option, 0)
+            else:
+                total += table.get(answer, 0)
+        return total
+
+    def class_index(self, score):
+        """Index into ``labels`` (lowest class first) for a score."""
+        return max(bisect_right(self.thresholds, score) - 1, 0)
+
+    def classify_score(self, score):
+        return self.labels[self.class_index(score)]
+
+    def classify(self, responses):
+        """Return ``(classification, score)`` for a single response."""
+        score = self.score(responses)
+        return self.classify_score(score), score
+
+
+SCORERS = {name: CompiledScorer(name, spec) for name, spec in SPECS.items()}
+SCORERS_BY_FILE = {scorer.file: scorer for scorer in SCORERS.values()}
+
+AWARENESS = SCORERS["awareness"]
+ROUTINE = SCORERS["routine"]
+WELLBEING = SCORERS["wellbeing"]
+ACTIVITIES = SCORERS["activities"]
@@ -0,0 +1,21 @@
+import os
+
+
+def get_setting(name, default=None):
+    """Read an app setting from Streamlit secrets, falling back to the environment."""
+    try:
+        import streamlit as st
+        if name in st.secrets:
+            return st.secrets[name]
+    except Exception:
+        # No secrets file (CLI tools, load tests) - use the environment instead.
+        pass
+    return os.environ.get(name.upper(), default)
+
+
+def get_flag(name, default=False):
+    """Read a boolean setting; environment values such as "1" or "true" count as on."""
+    value = get_setting(name, default)
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
@@ -0,0 +1,274 @@
+import os
+import copy
+from datetime import datetime, timezone
+from aggregates import ScoreAggregate
+from storage import ResponseStore, StorageError, WriteConflict, entry_matches
+
+MANIFEST_VERSION = 1
+
+
+class ShardedStore(ResponseStore):
+    """Splits each survey into bounded shard files listed in a small manifest.
+
+    For ``data/awareness.json`` the layout is::
+
+        data/awareness/manifest.json   {"version": 1, "shards": [...]}
+        data/awareness/000001.json     sealed shard
+        data/awareness/000002.json     active shard (last in the manifest)
+
+    Each manifest shard records its ``path`` and, once sealed, a ScoreAggregate
+    of its entries. Submissions only rewrite the active shard; the manifest is
+    written only when a new shard is started (every ``shard_size`` entries with
+    ``shard_by="count"``, or on the first submission of a UTC day with
+    ``shard_by="day"``) and again to seal the shard it closed. An existing single-file survey is adopted as the first,
+    sealed shard, so no migration step is needed.
+
+    ``inner`` must offer the ``read_json``/``iter_json``/``write_json``/``update_json``
+    document API (``GitHubContentsStore``, ``LocalJsonStore`` or ``GitDataStore``).
+    """
+
+    def __init__(self, inner, shard_size=1000, shard_by="count", max_retries=10):
+        if not hasattr(inner, "update_json"):
+            raise StorageError("Sharded storage needs the `github` or `local` backend.")
+        if shard_by not in ("count", "day"):
+            raise StorageError(f"Unknown shard_by `{shard_by}`. Use `count` or `day`.")
+        self.inner = inner
+        self.shard_size = shard_size
+        self.shard_by = shard_by
+        self.max_retries = max_retries
+
+    @staticmethod
+    def shard_dir(file_name):
+        return os.path.splitext(file_name)[0]
+
+    def manifest_path(self, file_name):
+        return f"{self.shard_dir(file_name)}/manifest.json"
+
+    def manifest(self, file_name, revalidate=False):
+        """Return ``(manifest, version)``; ``version`` is ``None`` until it is first written.
+
+        The manifest is a copy the caller may change: ``read_json`` hands out the
+        read cache's own object, and an edit that is never committed must not
+        linger there.
+        """
+        manifest, version = self.inner.read_json(self.manifest_path(file_name), revalidate=revalidate)
+        manifest = copy.deepcopy(manifest)
+        if manifest is None:
+            manifest = {"version": MANIFEST_VERSION, "shards": []}
+            legacy = ScoreAggregate.from_entries(self.inner.iter_json(file_name))
+            if legacy.count:
+                manifest["shards"].append({"path": file_name, "aggregate": legacy.to_dict()})
+        return manifest, version
+
+    def _new_shard_path(self, file_name, manifest):
+        if self.shard_by == "day":
+            name = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        else:
+            name = f"{len(manifest['shards']) + 1:06d}"
+        return f"{self.shard_dir(file_name)}/{name}.json"
+
+    def _needs_new_shard(self, file_name, manifest, active_entries):
+        shards = manifest["shards"]
+        if not shards or shards[-1]["aggregate"] is not None:
+            return True
+        if self.shard_by == "day":
+            return shards[-1]["path"] != self._new_shard_path(file_name, manifest)
+        return len(active_entries) >= self.shard_size
+
+    def append(self, file_name, entry):
+        self.append_many(file_name, [entry])
+
+    def append_many(self, file_name, entries):
+        for _ in range(self.max_retries + 1):
+            manifest, version = self.manifest(file_name, revalidate=True)
+            shards = manifest["shards"]
+            if self._closed(manifest):
+                self._seal(file_name, manifest, version)
+                continue
+            active_entries = []
+            if shards and shards[-1]["aggregate"] is None:
+                active_entries, _ = self.inner.read_json(shards[-1]["path"], revalidate=True)
+                active_entries = active_entries or []
+
+            if self._needs_new_shard(file_name, manifest, active_entries):
+                # Closing the active shard and sealing it are separate manifest writes, so
+                # the aggregate is only computed once no new writer can pick the shard.
+                shards.append({"path": self._new_shard_path(file_name, manifest), "aggregate": None})
+                try:
+                    self.inner.write_json(
+                        self.manifest_path(file_name), manifest, version,
+                        message=f"Start shard {shards[-1]['path']}",
+                    )
+                except WriteConflict:
+                    # Another writer started a shard first; use theirs.
+                    pass
+                continue
+
+            path, start = shards[-1]["path"], []
+
+            def add(data):
+                data = list(data or [])
+                start[:] = [len(data)]
+                return data + list(entries)
+
+            count = len(entries)
+            self.inner.update_json(
+                path, add, message=f"Add {count} response{'s' if count != 1 else ''} to {path}",
+            )
+            if not self._take_back(file_name, path, entries, start[0]):
+                return
+        raise WriteConflict(f"Could not start a new shard for {file_name}.")
+
+    @staticmethod
+    def _closed(manifest):
+        """Shards that were closed (a newer shard follows) but whose aggregate is not stored yet."""
+        return [shard for shard in manifest["shards"][:-1] if shard["aggregate"] is None]
+
+    def _seal(self, file_name, manifest, version):
+        """Store the aggregates of closed shards; returns False if another writer changed the manifest."""
+        for shard in self._closed(manifest):
+            entries, _ = self.inner.read_json(shard["path"], revalidate=True)
+            shard["aggregate"] = ScoreAggregate.from_entries(entries or []).to_dict()
+        try:
+            self.inner.write_json(self.manifest_path(file_name), manifest, version, message="Seal closed shards")
+        except WriteConflict:
+            return False
+        return True
+
+    def _take_back(self, file_name, path, entries, start):
+        """Remove ``entries`` (written at ``start``) from shard ``path`` again if it was sealed without them.
+
+        A closed shard is sealed from what the sealing writer read, so entries that
+        land in it afterwards (from writers that read the manifest before the shard
+        was closed) are not counted. Positions below the sealed count never change,
+        so a writer whose entries start at or beyond it moves them to the new
+        active shard. Returns True if the entries were taken back.
+        """
+        while True:
+            manifest, version = self.manifest(file_name, revalidate=True)
+            shards = manifest["shards"]
+            index = next((i for i, shard in enumerate(shards) if shard["path"] == path), None)
+            if index is None or index == len(shards) - 1:
+                # Still active: whoever seals it later reads these entries.
+                return False
+            if shards[index]["aggregate"] is not None:
+                break
+            # Closed but not sealed yet; sealing it now counts these entries.
+            self._seal(file_name, manifest, version)
+        covered = shards[index]["aggregate"]["count"]
+        if start < covered:
+            return False
+        taken = []
+
+        def drop_late(data):
+            taken.clear()
+            data = list(data or [])
+            ours, kept = list(entries), data[:covered]
+            for entry in data[covered:]:
+                if entry in ours:
+                    ours.remove(entry)
+                    taken.append(entry)
+                else:
+                    kept.append(entry)
+            return kept
+
+        self.inner.update_json(path, drop_late, message=f"Move {len(entries)} late responses out of sealed {path}")
+        return bool(taken)
+
+    def _unsealed_entries(self, manifest):
+        """Entries of every shard without a stored aggregate: the active one and any closed ones."""
+        entries = []
+        for shard in manifest["shards"]:
+            if shard["aggregate"] is None:
+                shard_entries, _ = self.inner.read_json(shard["path"])
+                entries.extend(shard_entries or [])
+        return entries
+
+    def shard_entries(self, file_name):
+        """Yield ``(shard, entries)`` for every shard in submission order."""
+        manifest, _ = self.manifest(file_name)
+        for shard in manifest["shards"]:
+            entries, _ = self.inner.read_json(shard["path"])
+            yield shard, entries or []
+
+    def iter_entries(self, file_name):
+        """Stream every shard in turn, holding at most one entry in memory."""
+        manifest, _ = self.manifest(file_name)
+        for shard in manifest["shards"]:
+            yield from self.inner.iter_json(shard["path"])
+
+    def load(self, file_name):
+        entries = []
+        for _, shard_entries in self.shard_entries(file_name):
+            entries.extend(shard_entries)
+        return entries
+
+    def count(self, file_name):
+        manifest, _ = self.manifest(file_name)
+        sealed = sum(shard["aggregate"]["count"] for shard in manifest["shards"] if shard["aggregate"])
+        return sealed + len(self._unsealed_entries(manifest))
+
+    def get_entry(self, file_name, index):
+        """Read only the shard that holds ``index``."""
+        manifest, _ = self.manifest(file_name)
+        offset = index
+        for shard in manifest["shards"]:
+            if shard["aggregate"] is None:
+                entries, _ = self.inner.read_json(shard["path"])
+                if offset < len(entries or []):
+                    return entries[offset]
+                offset -= len(entries or [])
+                continue
+            if offset < shard["aggregate"]["count"]:
+                entries, _ = self.inner.read_json(shard["path"])
+                return (entries or [])[offset]
+            offset -= shard["aggregate"]["count"]
+        raise IndexError(index)
+
+    def query(self, file_name, min_score=None, max_score=None, since=None, until=None, after=None, limit=20):
+        """Skip sealed shards that lie before ``after`` or outside the score range."""
+        manifest, _ = self.manifest(file_name)
+        page, offset = [], 0
+        for shard in manifest["shards"]:
+            aggregate = shard["aggregate"]
+            if aggregate is not None and (
+                (after is not None and offset + aggregate["count"] <= after + 1)
+                or not aggregate["count"]
+                or (min_score is not None and aggregate["max"] < min_score)
+                or (max_score is not None and aggregate["min"] > max_score)
+            ):
+                offset += aggregate["count"]
+                continue
+            entries, _ = self.inner.read_json(shard["path"])
+            for position, entry in enumerate(entries or [], offset):
+                if (after is None or position > after) and entry_matches(entry, min_score, max_score, since, until):
+                    page.append((position, entry))
+                    if len(page) == limit:
+                        return page
+            offset += len(entries or [])
+        return page
+
+    def aggregate(self, file_name):
+        """Merge the sealed shards' stored aggregates with the active shard."""
+        manifest, _ = self.manifest(file_name)
+        total = ScoreAggregate()
+        for shard in manifest["shards"]:
+            if shard["aggregate"]:
+                total.merge(ScoreAggregate.from_dict(shard["aggregate"]))
+        return total.merge(ScoreAggregate.from_entries(self._unsealed_entries(manifest)))
+
+    def summary(self, file_name):
+        return self.aggregate(file_name).summary()
+
+    def rebuild_manifest(self, file_name):
+        """Recompute every sealed shard's aggregate from its entries."""
+        def rebuild(manifest):
+            for shard in manifest["shards"]:
+                if shard["aggregate"] is not None:
+                    entries = self.inner.iter_json(shard["path"])
+                    shard["aggregate"] = ScoreAggregate.from_entries(entries).to_dict()
+            return manifest
+
+        manifest, version = self.manifest(file_name, revalidate=True)
+        self.inner.write_json(self.manifest_path(file_name), rebuild(manifest), version,
+                              message=f"Rebuild {self.manifest_path(file_name)}")
@@ -0,0 +1,165 @@
+import os
+import json
+import sqlite3
+import threading
+from storage import ResponseStore, StorageError, submitted_at
+
+
+class SQLiteStore(ResponseStore):
+    """Stores responses in a local SQLite database, one table per survey.
+
+    The database runs in WAL mode so the analysis pages can read while a
+    submission is being written. Each survey table is indexed on submission
+    time, score and respondent, and a ``survey_stats`` row per survey is kept
+    up to date in the same transaction as every insert, so score aggregates
+    never require a table scan.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._ready = set()
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS survey_stats ("
+                "survey TEXT PRIMARY KEY, count INTEGER NOT NULL, total INTEGER NOT NULL, "
+                "min_score INTEGER, max_score INTEGER)"
+            )
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def table_name(file_name):
+        stem = os.path.splitext(os.path.basename(file_name))[0]
+        if not stem.isidentifier():
+            raise StorageError(f"Invalid survey file name `{file_name}`.")
+        return stem
+
+    def _table(self, file_name):
+        """Return the survey table, creating and seeding it on first use."""
+        table = self.table_name(file_name)
+        if table in self._ready:
+            return table
+
+        with self._lock:
+            if table not in self._ready:
+                conn = self._connection()
+                with conn:
+                    conn.execute(
+                        f"CREATE TABLE IF NOT EXISTS {table} ("
+                        "id INTEGER PRIMARY KEY AUTOINCREMENT, submitted_at TEXT, respondent TEXT, "
+                        "score INTEGER NOT NULL, entry TEXT NOT NULL)"
+                    )
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_submitted_at ON {table} (submitted_at)")
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_score ON {table} (score)")
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_respondent ON {table} (respondent)")
+                    seeded = conn.execute("SELECT 1 FROM survey_stats WHERE survey = ?", (table,)).fetchone()
+                    if not seeded:
+                        conn.execute("INSERT INTO survey_stats VALUES (?, 0, 0, NULL, NULL)", (table,))
+                        self._insert(conn, table, self._legacy_entries(file_name))
+                self._ready.add(table)
+        return table
+
+    def _legacy_entries(self, file_name):
+        """Entries from the local JSON array the survey used before SQLite."""
+        path = os.path.join(os.path.dirname(self.path), os.path.basename(file_name))
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            raise StorageError(f"Failed to decode {path}.")
+
+    @staticmethod
+    def _insert(conn, table, entries):
+        rows = [
+            (submitted_at(entry), entry.get("respondent"), entry["score"],
+             json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+            for entry in entries
+        ]
+        if not rows:
+            return
+        conn.executemany(
+            f"INSERT INTO {table} (submitted_at, respondent, score, entry) VALUES (?, ?, ?, ?)", rows
+        )
+        scores = [row[2] for row in rows]
+        conn.execute(
+            "UPDATE survey_stats SET count = count + ?, total = total + ?, "
+            "min_score = min(coalesce(min_score, ?), ?), max_score = max(coalesce(max_score, ?), ?) "
+            "WHERE survey = ?",
+            (len(scores), sum(scores), min(scores), min(scores), max(scores), max(scores), table),
+        )
+
+    def load(self, file_name):
+        table = self._table(file_name)
+        rows = self._connection().execute(f"SELECT entry FROM {table} ORDER BY id").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_entries(self, file_name):
+        table = self._table(file_name)
+        for (entry,) in self._connection().execute(f"SELECT entry FROM {table} ORDER BY id"):
+            yield json.loads(entry)
+
+    def append(self, file_name, entry):
+        self.append_many(file_name, [entry])
+
+    def append_many(self, file_name, entries):
+        table = self._table(file_name)
+        conn = self._connection()
+        try:
+            with conn:
+                self._insert(conn, table, entries)
+        except sqlite3.Error as e:
+            raise StorageError(f"Failed to save {file_name}. {e}")
+
+    def query(self, file_name, min_score=None, max_score=None, since=None, until=None, after=None, limit=20):
+        """Seek with the score/submitted_at indexes; ``id - 1`` is the entry's position."""
+        table = self._table(file_name)
+        clauses, params = ["id > ?"], [0 if after is None else after + 1]
+        for clause, value in (("score >= ?", min_score), ("score <= ?", max_score),
+                              ("submitted_at >= ?", since), ("submitted_at < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        rows = self._connection().execute(
+            f"SELECT id, entry FROM {table} WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [(row_id - 1, json.loads(entry)) for row_id, entry in rows]
+
+    def find_respondent(self, file_name, respondent):
+        table = self._table(file_name)
+        rows = self._connection().execute(
+            f"SELECT id, entry FROM {table} WHERE respondent = ? ORDER BY id", (respondent,)
+        ).fetchall()
+        return [(row_id - 1, json.loads(entry)) for row_id, entry in rows]
+
+    def count(self, file_name):
+        return self.summary(file_name)["count"]
+
+    def get_entry(self, file_name, index):
+        """Look the entry up by primary key; ``id - 1`` is the entry's position."""
+        table = self._table(file_name)
+        row = None
+        if index >= 0:
+            row = self._connection().execute(f"SELECT entry FROM {table} WHERE id = ?", (index + 1,)).fetchone()
+        if row is None:
+            raise IndexError(index)
+        return json.loads(row[0])
+
+    def summary(self, file_name):
+        table = self._table(file_name)
+        count, total, low, high = self._connection().execute(
+            "SELECT count, total, min_score, max_score FROM survey_stats WHERE survey = ?", (table,)
+        ).fetchone()
+        return {"count": count, "mean": total / count if count else 0, "min": low, "max": high}
@@ -0,0 +1,732 @@
+import os
+import json
+import time
+import base64
+import hashlib
+import random
+import itertools
+import threading
+import requests
+import http_client
+from read_cache import ReadCache
+from rate_limit import get_governor
+from json_stream import iter_json_array, iter_json_file
+from settings import get_flag, get_setting
+from datetime import datetime, timezone
+
+# Constants for GitHub integration
+GITHUB_USER = "hawkarabdulhaq"
+GITHUB_REPO = "energyscan"
+GITHUB_API_URL = "https://api.github.com"
+
+# Local storage settings
+LOCAL_DATA_DIR = "data"
+
+
+class StorageError(Exception):
+    """Raised when a response store cannot read or write survey data."""
+
+
+class WriteConflict(StorageError):
+    """Raised when a write is based on a stale version of the file."""
+
+
+class WriteTimeout(StorageError):
+    """Raised when a write was abandoned after its deadline; it may still land later."""
+
+
+class SubmitStats:
+    """Thread-safe counters for the GitHub submit path."""
+
+    FIELDS = ("writes", "retries", "conflicts", "failures", "duplicates")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, field, amount=1):
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+SUBMIT_STATS = SubmitStats()
+
+
+def idempotency_key(respondent, responses, attempt=None):
+    """Hash of who submitted what in which attempt; repeat submits of one attempt share it.
+
+    Truncated to 16 hex digits (64 bits): keys are only compared within one
+    survey, and every stored entry carries one.
+    """
+    canonical = json.dumps(
+        {"respondent": respondent, "responses": responses, "attempt": attempt}, sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def new_entry(score, responses, respondent=None, attempt=None):
+    """Build a survey entry stamped with its submission time, idempotency key and respondent (if known).
+
+    ``attempt`` tells apart genuine retakes with the same answers; see ``respondents.attempt_id``.
+    """
+    entry = {
+        "score": score,
+        "responses": dict(responses),
+        "submitted_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "key": idempotency_key(respondent, responses, attempt),
+    }
+    if respondent:
+        entry["respondent"] = respondent
+    return entry
+
+
+def summarize_scores(scores):
+    """Return count, mean, min and max for an iterable of scores."""
+    count, total, low, high = 0, 0, None, None
+    for score in scores:
+        count += 1
+        total += score
+        low = score if low is None else min(low, score)
+        high = score if high is None else max(high, score)
+    return {"count": count, "mean": total / count if count else 0, "min": low, "max": high}
+
+
+def dump_json(data, indent=4):
+    """Serialize a survey file; ``indent=None`` writes it without any whitespace."""
+    separators = (",", ":") if indent is None else None
+    return json.dumps(data, indent=indent, separators=separators, ensure_ascii=False)
+
+
+def submitted_at(entry):
+    """An entry's submission time as stored by ``new_entry``, also for compact entries (see ``encoding``)."""
+    if "t" in entry:
+        return datetime.fromtimestamp(entry["t"], timezone.utc).isoformat(timespec="seconds")
+    return entry.get("submitted_at")
+
+
+def entry_matches(entry, min_score=None, max_score=None, since=None, until=None):
+    """True if an entry passes the ``ResponseStore.query`` filters."""
+    if min_score is not None and entry["score"] < min_score:
+        return False
+    if max_score is not None and entry["score"] > max_score:
+        return False
+    if since is not None or until is not None:
+        submitted = submitted_at(entry)
+        if submitted is None:
+            return False
+        if since is not None and submitted < since:
+            return False
+        if until is not None and submitted >= until:
+            return False
+    return True
+
+
+def get_github_pat():
+    """Retrieve the GitHub PAT from Streamlit secrets or the environment."""
+    return get_setting("github_pat")
+
+
+class ResponseStore:
+    """Interface shared by every survey response backend.
+
+    Surveys are addressed by their data file name (e.g. ``data/awareness.json``)
+    regardless of how the backend lays the data out.
+    """
+
+    # True when append_batches writes every survey or none of them.
+    atomic_batches = False
+
+    def load(self, file_name):
+        """Return all stored entries for a survey as a list."""
+        raise NotImplementedError
+
+    def iter_entries(self, file_name):
+        """Yield stored entries one at a time; backends override this to stream."""
+        yield from self.load(file_name)
+
+    def append(self, file_name, entry):
+        """Persist a single survey entry."""
+        raise NotImplementedError
+
+    def append_many(self, file_name, entries):
+        """Persist several entries for one survey; backends override this to batch."""
+        for entry in entries:
+            self.append(file_name, entry)
+
+    def append_batches(self, batches):
+        """Persist ``{file_name: entries}`` for several surveys, atomically where supported."""
+        for file_name, entries in batches.items():
+            self.append_many(file_name, entries)
+
+    def count(self, file_name):
+        """Return the number of stored entries for a survey."""
+        return len(self.load(file_name))
+
+    def get_entry(self, file_name, index):
+        """Return the entry at ``index`` (0-based, submission order)."""
+        return self.load(file_name)[index]
+
+    def summary(self, file_name):
+        """Return score aggregates (count, mean, min, max) for a survey."""
+        return summarize_scores(entry["score"] for entry in self.iter_entries(file_name))
+
+    def find_respondent(self, file_name, respondent):
+        """Return ``(position, entry)`` for every entry a respondent submitted to a survey."""
+        return [
+            (position, entry) for position, entry in enumerate(self.iter_entries(file_name))
+            if entry.get("respondent") == respondent
+        ]
+
+    def query(self, file_name, min_score=None, max_score=None, since=None, until=None, after=None, limit=20):
+        """Return up to ``limit`` ``(position, entry)`` pairs matching the filters.
+
+        Positions are 0-based submission order. Pass the last position of a page
+        as ``after`` to get the next one (keyset pagination). Scores are
+        inclusive bounds; ``since``/``until`` are ISO date or timestamp strings
+        compared with ``submitted_at`` (``until`` exclusive). This default scans
+        ``iter_entries`` but only keeps one page; backends override it to seek.
+        """
+        page = []
+        for position, entry in enumerate(self.iter_entries(file_name)):
+            if after is not None and position <= after:
+                continue
+            if entry_matches(entry, min_score, max_score, since, until):
+                page.append((position, entry))
+                if len(page) == limit:
+                    break
+        return page
+
+
+class DelegatingStore(ResponseStore):
+    """Base for layers that wrap another store and add behaviour on top of it.
+
+    Everything passes through to ``inner``; ``append`` and ``append_many`` are
+    routed to ``append_batches``, so a layer that acts on writes overrides only
+    that one method.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    @property
+    def atomic_batches(self):
+        return self.inner.atomic_batches
+
+    def load(self, file_name):
+        return self.inner.load(file_name)
+
+    def iter_entries(self, file_name):
+        return self.inner.iter_entries(file_name)
+
+    def append(self, file_name, entry):
+        self.append_many(file_name, [entry])
+
+    def append_many(self, file_name, entries):
+        self.append_batches({file_name: entries})
+
+    def append_batches(self, batches):
+        self.inner.append_batches(batches)
+
+    def count(self, file_name):
+        return self.inner.count(file_name)
+
+    def get_entry(self, file_name, index):
+        return self.inner.get_entry(file_name, index)
+
+    def summary(self, file_name):
+        return self.inner.summary(file_name)
+
+    def find_respondent(self, file_name, respondent):
+        return self.inner.find_respondent(file_name, respondent)
+
+    def query(self, file_name, **filters):
+        return self.inner.query(file_name, **filters)
+
+
+def find_layer(store, attribute):
+    """The outermost layer of a wrapped store stack that has ``attribute``, or ``None``.
+
+    Layers are matched on behaviour rather than class, which also works when a
+    layer's module runs as a script (and is ``__main__``).
+    """
+    while store is not None:
+        if hasattr(store, attribute):
+            return store
+        store = getattr(store, "inner", None)
+    return None
+
+
+class GitHubContentsStore(ResponseStore):
+    """Stores each survey as one JSON array file via the GitHub Contents API."""
+
+    def __init__(self, token, user=GITHUB_USER, repo=GITHUB_REPO, api_url=GITHUB_API_URL,
+                 max_retries=5, backoff=0.2, max_backoff=3.0, cache=None, indent=4):
+        self.token = token
+        self.user = user
+        self.repo = repo
+        self.api_url = api_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.cache = cache if cache is not None else ReadCache()
+        self.indent = indent
+
+    def _url(self, path):
+        return f"{self.api_url}/repos/{self.user}/{self.repo}/contents/{path}"
+
+    def _headers(self):
+        if not self.token:
+            raise StorageError("GitHub PAT not found in secrets! Please add `github_pat` to your secrets.")
+        return {
+            "Authorization": f"token {self.token}",
+            "Accept": "application/vnd.github.v3+json",
+        }
+
+    def read_json(self, path, revalidate=False):
+        """Return ``(data, sha)`` for a JSON file, or ``(None, None)`` if it does not exist.
+
+        Reads are served from the read cache while it is fresh; otherwise the
+        cached ETag is sent as ``If-None-Match`` so an unchanged file costs a 304.
+        ``revalidate=True`` skips the TTL check (used before writes). While the
+        API budget is under pressure any cached copy is served, however old.
+        """
+        cached = None if revalidate else self.cache.get_fresh(path)
+        if cached is None and not revalidate and get_governor().under_pressure():
+            cached = self.cache.get_stale(path)
+        if cached is not None:
+            return cached.data, cached.sha
+
+        headers = self._headers()
+        generation = self.cache.generation()
+        cached = self.cache.get(path)
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+
+        try:
+            response = http_client.request("GET", self._url(path), headers=headers)
+        except requests.RequestException as e:
+            raise StorageError(f"Failed to fetch {path}. {e}")
+        if response.status_code == 304 and cached is not None:
+            self.cache.revalidated(path)
+            return cached.data, cached.sha
+        if response.status_code == 404:
+            self.cache.invalidate(path)
+            return None, None
+        if response.status_code != 200:
+            raise StorageError(f"Failed to fetch {path}. Error {response.status_code}: {response.text}")
+
+        try:
+            body = response.json()
+        except ValueError:
+            raise StorageError(f"Failed to fetch {path}. The response was not JSON.")
+        content = body.get("content", "")
+        if not content and body.get("size"):
+            # Files over 1 MB come without inline content; fetch those raw.
+            data = list(self._stream_raw(path))
+        else:
+            try:
+                data = json.loads(base64.b64decode(content).decode("utf-8")) if content else []
+            except ValueError:
+                raise StorageError(f"Failed to decode {path}.")
+        self.cache.put(path, data, body.get("sha"), response.headers.get("ETag"), generation)
+        return data, body.get("sha")
+
+    def iter_json(self, path):
+        """Yield the elements of a JSON array file without decoding it all at once.
+
+        Uses the raw media type, so the body is parsed as it streams in instead of
+        going through base64. A fresh cached copy is used when there is one, or
+        any cached copy while the API budget is under pressure.
+        """
+        cached = self.cache.get_fresh(path)
+        if cached is None and get_governor().under_pressure():
+            cached = self.cache.get_stale(path)
+        if cached is not None:
+            yield from cached.data or []
+            return
+        yield from self._stream_raw(path)
+
+    def _stream_raw(self, path):
+        try:
+            response = http_client.request(
+                "GET", self._url(path), headers={**self._headers(), "Accept": "application/vnd.github.raw"},
+                stream=True,
+            )
+        except requests.RequestException as e:
+            raise StorageError(f"Failed to fetch {path}. {e}")
+        with response:
+            if response.status_code == 404:
+                return
+            if response.status_code != 200:
+                raise StorageError(f"Failed to fetch {path}. Error {response.status_code}: {response.text}")
+            response.raw.decode_content = True
+            try:
+                yield from iter_json_array(response.raw)
+            except ValueError:
+                raise StorageError(f"Failed to decode {path}.")
+
+    def write_json(self, path, data, sha=None, message=None):
+        """Create or update a JSON file; ``sha`` must match the current blob when updating."""
+        encoded_content = base64.b64encode(dump_json(data, self.indent).encode("utf-8")).decode("utf-8")
+        payload = {
+            "message": message or f"Update {os.path.basename(path)} with new responses",
+            "content": encoded_content,
+        }
+        if sha:
+            payload["sha"] = sha
+
+        try:
+            response = http_client.request("PUT", self._url(path), headers=self._headers(), json=payload)
+        except requests.RequestException as e:
+            raise StorageError(f"Failed to save {path}. {e}")
+        # 409: sha no longer matches; 422: the file was created since we read it.
+        if response.status_code in [409, 422]:
+            raise WriteConflict(f"{path} changed while saving. Error {response.status_code}: {response.text}")
+        if response.status_code not in [200, 201]:
+            self.cache.invalidate(path)
+            raise StorageError(f"Failed to save {path}. Error {response.status_code}: {response.text}")
+        try:
+            new_sha = response.json().get("content", {}).get("sha")
+        except ValueError:
+            # Saved, but the new SHA is unknown; the next write reads it fresh.
+            self.cache.invalidate(path)
+            return None
+        self.cache.written(path, data, new_sha)
+        return new_sha
+
+    def load(self, file_name):
+        data, _ = self.read_json(file_name)
+        return data or []
+
+    def update_json(self, path, update, message=None):
+        """Apply ``update(data)`` to a JSON file with optimistic concurrency.
+
+        The file is read once to get both content and SHA. If the PUT loses a race
+        with another writer, the update is re-applied to the fresh content, up to
+        ``max_retries`` times with jittered exponential backoff.
+        """
+        for attempt in range(self.max_retries + 1):
+            data, sha = self.read_json(path, revalidate=True)
+            try:
+                new_sha = self.write_json(path, update(data), sha, message)
+            except WriteConflict:
+                SUBMIT_STATS.incr("conflicts")
+                if attempt == self.max_retries:
+                    SUBMIT_STATS.incr("failures")
+                    raise
+                SUBMIT_STATS.incr("retries")
+                time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+            except StorageError:
+                SUBMIT_STATS.incr("failures")
+                raise
+            else:
+                SUBMIT_STATS.incr("writes")
+                return new_sha
+
+    def append(self, file_name, entry):
+        self.append_many(file_name, [entry])
+
+    def iter_entries(self, file_name):
+        return self.iter_json(file_name)
+
+    def append_many(self, file_name, entries):
+        count = len(entries)
+        message = f"Update {os.path.basename(file_name)} with {count} new response{'s' if count != 1 else ''}"
+        self.update_json(file_name, lambda data: list(data or []) + list(entries), message)
+
+
+class LocalJsonStore(ResponseStore):
+    """Keeps each survey as a JSON array file on local disk, mirroring the GitHub layout.
+
+    Offers the same ``read_json``/``write_json``/``update_json`` document API as
+    ``GitHubContentsStore`` (the version is the file's mtime and size), so layouts
+    built on that API work against either. Intended for a single app process.
+    """
+
+    def __init__(self, root=".", indent=4):
+        self.root = root
+        self.indent = indent
+        self._lock = threading.RLock()
+
+    def _path(self, path):
+        return os.path.join(self.root, path)
+
+    @staticmethod
+    def _version(full_path):
+        stat = os.stat(full_path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def read_json(self, path, revalidate=False):
+        """Return ``(data, version)``, or ``(None, None)`` if the file does not exist."""
+        full_path = self._path(path)
+        with self._lock:
+            if not os.path.exists(full_path):
+                return None, None
+            try:
+                with open(full_path, encoding="utf-8") as f:
+                    return json.load(f), self._version(full_path)
+            except json.JSONDecodeError:
+                raise StorageError(f"Failed to decode {path}.")
+
+    def iter_json(self, path):
+        """Yield the elements of a JSON array file; missing files yield nothing."""
+        # Writes replace the file atomically, so an open handle reads one version.
+        try:
+            f = open(self._path(path), "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            try:
+                yield from iter_json_array(f)
+            except ValueError:
+                raise StorageError(f"Failed to decode {path}.")
+
+    def write_json(self, path, data, sha=None, message=None):
+        full_path = self._path(path)
+        with self._lock:
+            current = self._version(full_path) if os.path.exists(full_path) else None
+            if current != sha:
+                raise WriteConflict(f"{path} changed while saving.")
+            os.makedirs(os.path.dirname(full_path) or ".", exist_ok=True)
+            with open(full_path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(dump_json(data, self.indent))
+            os.replace(full_path + ".tmp", full_path)
+            return self._version(full_path)
+
+    def update_json(self, path, update, message=None):
+        with self._lock:
+            data, version = self.read_json(path)
+            return self.write_json(path, update(data), version, message)
+
+    def load(self, file_name):
+        data, _ = self.read_json(file_name)
+        return data or []
+
+    def iter_entries(self, file_name):
+        return self.iter_json(file_name)
+
+    def append(self, file_name, entry):
+        self.append_many(file_name, [entry])
+
+    def append_many(self, file_name, entries):
+        self.update_json(file_name, lambda data: list(data or []) + list(entries))
+
+
+class JsonLinesStore(ResponseStore):
+    """Local append-only log with one JSON document per line.
+
+    Each submission is a single ``write`` to ``<survey>.jsonl`` so the cost does
+    not grow with the number of stored responses. Entries already present in the
+    legacy ``<survey>.json`` array are returned ahead of the log on reads.
+
+    ``count`` and ``get_entry`` use the byte offsets of the log's lines, which are
+    extended by reading only what was appended since the last call, and the
+    legacy array's length, which is counted once per version of that file.
+    """
+
+    def __init__(self, root=LOCAL_DATA_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        # log path -> (bytes scanned, start offset of every entry line)
+        self._offsets = {}
+        # legacy path -> (file version, entry count)
+        self._legacy_counts = {}
+
+    def log_path(self, file_name):
+        stem = os.path.splitext(os.path.basename(file_name))[0]
+        return os.path.join(self.root, f"{stem}.jsonl")
+
+    def _legacy_entries(self, file_name):
+        path = os.path.join(self.root, os.path.basename(file_name))
+        if not os.path.exists(path):
+            return
+        try:
+            yield from iter_json_file(path)
+        except ValueError:
+            raise StorageError(f"Failed to decode {path}.")
+
+    def iter_entries(self, file_name):
+        yield from self._legacy_entries(file_name)
+        path = self.log_path(file_name)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+
+    def load(self, file_name):
+        return list(self.iter_entries(file_name))
+
+    def _legacy_count(self, file_name):
+        path = os.path.join(self.root, os.path.basename(file_name))
+        if not os.path.exists(path):
+            return 0
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._legacy_counts.get(path)
+        if cached is None or cached[0] != version:
+            cached = self._legacy_counts[path] = (version, sum(1 for _ in self._legacy_entries(file_name)))
+        return cached[1]
+
+    def _line_offsets(self, file_name):
+        """Start offsets of the log's entry lines, scanning only bytes appended since the last call."""
+        path = self.log_path(file_name)
+        with self._lock:
+            scanned, offsets = self._offsets.get(path, (0, []))
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size < scanned:
+                # The log was replaced by a shorter one; start over.
+                scanned, offsets = 0, []
+            if size > scanned:
+                with open(path, "rb") as f:
+                    f.seek(scanned)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            # Another process is still writing this line.
+                            break
+                        if line.strip():
+                            offsets.append(scanned)
+                        scanned += len(line)
+            self._offsets[path] = (scanned, offsets)
+            return offsets
+
+    def count(self, file_name):
+        return self._legacy_count(file_name) + len(self._line_offsets(file_name))
+
+    def get_entry(self, file_name, index):
+        if index < 0:
+            raise IndexError(index)
+        legacy = self._legacy_count(file_name)
+        if index < legacy:
+            return next(itertools.islice(self._legacy_entries(file_name), index, None))
+        offsets = self._line_offsets(file_name)
+        if index - legacy >= len(offsets):
+            raise IndexError(index)
+        with open(self.log_path(file_name), "rb") as f:
+            f.seek(offsets[index - legacy])
+            return json.loads(f.readline())
+
+    def append(self, file_name, entry):
+        self.append_many(file_name, [entry])
+
+    def append_many(self, file_name, entries):
+        lines = "".join(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n" for entry in entries)
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            with open(self.log_path(file_name), "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def _json_indent():
+    # Compactly encoded entries are meant to stay small on disk too.
+    return None if get_flag("compact_encoding") else 4
+
+
+# Imported lazily: these backends build on the ResponseStore defined here.
+def _git_data_store():
+    from git_data_store import GitDataStore
+    return GitDataStore(
+        get_github_pat(),
+        branch=get_setting("github_branch", "main"),
+        api_url=get_setting("github_api_url", GITHUB_API_URL),
+        max_retries=int(get_setting("github_max_retries", 5)),
+        head_ttl=float(get_setting("cache_ttl", 30)),
+        indent=_json_indent(),
+    )
+
+
+def _sqlite_store():
+    from sqlite_store import SQLiteStore
+    return SQLiteStore(get_setting("sqlite_path", os.path.join(LOCAL_DATA_DIR, "responses.db")))
+
+
+BACKENDS = {
+    "github": lambda: GitHubContentsStore(
+        get_github_pat(),
+        api_url=get_setting("github_api_url", GITHUB_API_URL),
+        max_retries=int(get_setting("github_max_retries", 5)),
+        cache=ReadCache(ttl=float(get_setting("cache_ttl", 30))),
+        indent=_json_indent(),
+    ),
+    "local": lambda: LocalJsonStore(get_setting("local_root", "."), indent=_json_indent()),
+    "jsonl": lambda: JsonLinesStore(get_setting("local_data_dir", LOCAL_DATA_DIR)),
+    "git": lambda: _git_data_store(),
+    "sqlite": lambda: _sqlite_store(),
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide response store selected by the `storage_backend` setting."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = get_setting("storage_backend", "github")
+            if backend not in BACKENDS:
+                raise StorageError(f"Unknown storage backend `{backend}`. Choose one of: {', '.join(BACKENDS)}.")
+            _store = BACKENDS[backend]()
+            if get_flag("sharded"):
+                from sharded_store import ShardedStore
+                _store = ShardedStore(
+                    _store,
+                    shard_size=int(get_setting("shard_size", 1000)),
+                    shard_by=get_setting("shard_by", "count"),
+                )
+            if get_flag("compact_encoding"):
+                from encoding import CompactStore
+                _store = CompactStore(_store)
+            checks = []
+            if backend in ("github", "git") and get_flag("rate_limit_queue", True):
+                checks.append(get_governor().under_pressure)
+            if backend in ("github", "git") and get_flag("circuit_breaker", True):
+                from circuit_breaker import CircuitBreaker, ResilientStore
+                breaker = CircuitBreaker(
+                    failure_threshold=int(get_setting("circuit_failures", 3)),
+                    reset_timeout=float(get_setting("circuit_reset", 30)),
+                )
+                _store = ResilientStore(
+                    _store,
+                    breaker,
+                    snapshot_dir=get_setting("snapshot_dir", os.path.join(LOCAL_DATA_DIR, "snapshots")),
+                    timeout=float(get_setting("storage_timeout", 10)),
+                    snapshot_interval=float(get_setting("snapshot_interval", 300)),
+                    refresh_when=lambda: not get_governor().under_pressure(),
+                )
+                checks.append(lambda: not breaker.would_allow())
+            if get_flag("aggregates", True):
+                from aggregates import AggregatingStore
+                _store = AggregatingStore(_store, get_setting("local_data_dir", LOCAL_DATA_DIR))
+            if get_flag("write_behind") or checks:
+                from write_behind import WriteBehindStore
+                _store = WriteBehindStore(
+                    _store,
+                    spool_dir=get_setting("spool_dir", os.path.join(LOCAL_DATA_DIR, "spool")),
+                    max_batch=int(get_setting("write_behind_batch", 50)),
+                    max_delay=float(get_setting("write_behind_delay", 10)),
+                    # Without write_behind, submissions are only queued while the API budget
+                    # runs low or the circuit is open, and replayed afterwards.
+                    queue_when=None if get_flag("write_behind") else lambda: any(check() for check in checks),
+                )
+            if get_flag("respondent_index", True):
+                from respondents import RespondentIndexStore
+                _store = RespondentIndexStore(_store, get_setting("local_data_dir", LOCAL_DATA_DIR))
+            if get_flag("history", True):
+                from history import HistoryStore
+                _store = HistoryStore(_store, get_setting("local_data_dir", LOCAL_DATA_DIR))
+            if get_flag("dedup", True):
+                from dedup import DedupStore
+                _store = DedupStore(
+                    _store,
+                    get_setting("local_data_dir", LOCAL_DATA_DIR),
+                    capacity=int(get_setting("dedup_capacity", 10_000)),
+                )
+        return _store
@@ -0,0 +1,39 @@
+import os
+import pytest
+import storage
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture
+def open_admin(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "jsonl")
+    monkeypatch.setenv("LOCAL_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "_store", None)
+
+    def open_admin():
+        app = AppTest.from_file(APP, default_timeout=60)
+        app.session_state["current_page"] = "Admin"
+        app.run()
+        assert not app.exception
+        return app
+    return open_admin
+
+
+def test_admin_page_is_disabled_without_a_password(open_admin, monkeypatch):
+    monkeypatch.delenv("ADMIN_PASSWORD", raising=False)
+    app = open_admin()
+    assert not app.text_input
+    assert not app.subheader
+    assert "disabled" in app.info[0].value
+
+
+def test_admin_page_needs_the_configured_password(open_admin, monkeypatch):
+    monkeypatch.setenv("ADMIN_PASSWORD", "s3cret")
+    app = open_admin()
+    assert not app.subheader
+    app.text_input(key="admin_password").input("wrong").run()
+    assert not app.subheader
+    app.text_input(key="admin_password").input("s3cret").run()
+    assert app.subheader
@@ -0,0 +1,49 @@
+import os
+import pytest
+import storage
+from streamlit.testing.v1 import AppTest
+from scoring import AWARENESS
+from storage import SUBMIT_STATS, JsonLinesStore
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The survey page on the jsonl backend, with an empty data directory."""
+    monkeypatch.setenv("STORAGE_BACKEND", "jsonl")
+    monkeypatch.setenv("LOCAL_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(storage, "_store", None)
+    app = AppTest.from_file(APP, default_timeout=60)
+    app.session_state["current_page"] = "Survey"
+    app.run()
+    return app
+
+
+def submit(app):
+    next(button for button in app.button if button.label == "Submit Test").click()
+    app.run()
+    assert not app.exception
+
+
+def stored(tmp_path):
+    return JsonLinesStore(str(tmp_path)).load(AWARENESS.file)
+
+
+def test_repeat_click_after_a_successful_save_is_dropped(app, tmp_path):
+    submit(app)
+    duplicates = SUBMIT_STATS.snapshot()["duplicates"]
+    submit(app)
+    assert len(stored(tmp_path)) == 1
+    assert SUBMIT_STATS.snapshot()["duplicates"] == duplicates + 1
+
+
+def test_changed_answers_or_a_new_attempt_are_saved(app, tmp_path):
+    submit(app)
+    app.slider(key="reflection_q9").set_value(5).run()
+    submit(app)
+    app.button(key="awareness_retake").click().run()
+    submit(app)
+    entries = stored(tmp_path)
+    assert len(entries) == 3
+    assert len({entry["key"] for entry in entries}) == 3
@@ -0,0 +1,46 @@
+import random
+import pytest
+from batch_scoring import classification_counts, classify_batch, score_batch
+from scoring import MULTISELECT, SCORERS, SLIDER
+
+
+def random_responses(scorer, rng):
+    responses = {}
+    for question, spec in scorer.questions.items():
+        if spec["type"] == SLIDER:
+            responses[question] = rng.randint(spec["min"], spec["max"])
+        elif spec["type"] == MULTISELECT:
+            options = list(scorer.options[question]) + ["not an option"]
+            responses[question] = rng.sample(options, rng.randint(0, len(options)))
+        else:
+            # Unanswered and unknown answers score 0 in both scorers.
+            responses[question] = rng.choice(list(scorer.options[question]) + ["not an option", None])
+    return responses
+
+
+@pytest.mark.parametrize("survey", sorted(SCORERS))
+def test_score_batch_matches_compiled_scorer(survey):
+    scorer = SCORERS[survey]
+    rng = random.Random(survey)
+    responses = [random_responses(scorer, rng) for _ in range(2000)]
+    assert score_batch(survey, responses).tolist() == [scorer.score(r) for r in responses]
+
+
+@pytest.mark.parametrize("survey", sorted(SCORERS))
+def test_classify_batch_matches_compiled_scorer(survey):
+    scorer = SCORERS[survey]
+    rng = random.Random(survey)
+    responses = [random_responses(scorer, rng) for _ in range(500)]
+    class_indices, _ = classify_batch(survey, responses)
+    assert [scorer.labels[i] for i in class_indices] == [scorer.classify(r)[0] for r in responses]
+
+
+def test_classification_counts_across_batches():
+    survey = sorted(SCORERS)[0]
+    scorer = SCORERS[survey]
+    rng = random.Random(2)
+    responses = [random_responses(scorer, rng) for _ in range(1000)]
+    expected = {label: 0 for label in scorer.labels}
+    for r in responses:
+        expected[scorer.classify(r)[0]] += 1
+    assert classification_counts(survey, iter(responses), batch_size=77) == expected
@@ -0,0 +1,101 @@
+import random
+import pytest
+from encoding import CompactStore, decode_entry, encode_entry
+from scoring import MULTISELECT, SCORERS, SLIDER
+from storage import JsonLinesStore, new_entry
+
+
+def random_responses(scorer, rng):
+    responses = {}
+    for question, spec in scorer.questions.items():
+        if spec["type"] == SLIDER:
+            responses[question] = rng.randint(spec["min"], spec["max"])
+        elif spec["type"] == MULTISELECT:
+            # Decoding returns options in spec order, so pick them in that order.
+            responses[question] = [option for option in scorer.options[question] if rng.random() < 0.5]
+        else:
+            responses[question] = rng.choice(scorer.options[question])
+    return responses
+
+
+@pytest.mark.parametrize("survey", sorted(SCORERS))
+def test_round_trip(survey):
+    scorer = SCORERS[survey]
+    rng = random.Random(survey)
+    for _ in range(200):
+        responses = random_responses(scorer, rng)
+        entry = new_entry(scorer.score(responses), responses, respondent="abc123", attempt="n1")
+        encoded = encode_entry(scorer, entry)
+        assert "responses" not in encoded and "submitted_at" not in encoded
+        assert decode_entry(scorer, encoded) == entry
+
+
+@pytest.mark.parametrize("stamp", ["2024-03-01T12:00:00.5+00:00", "2024-03-01T13:00:00+01:00", "yesterday", None])
+def test_timestamps_that_do_not_round_trip_are_kept_verbatim(stamp):
+    scorer = SCORERS[sorted(SCORERS)[0]]
+    entry = {"score": 0, "responses": random_responses(scorer, random.Random(0)), "submitted_at": stamp}
+    encoded = encode_entry(scorer, entry)
+    assert "t" not in encoded
+    assert decode_entry(scorer, encoded) == entry
+
+
+def test_version_1_entries_still_decode():
+    scorer = SCORERS[sorted(SCORERS)[0]]
+    entry = new_entry(1, random_responses(scorer, random.Random(0)))
+    encoded = encode_entry(scorer, entry)
+    del encoded["t"]
+    encoded.update(v=1, submitted_at=entry["submitted_at"])
+    assert decode_entry(scorer, encoded) == entry
+
+
+@pytest.mark.parametrize("survey", sorted(SCORERS))
+def test_answers_outside_the_spec_survive(survey):
+    scorer = SCORERS[survey]
+    responses = random_responses(scorer, random.Random(0))
+    for question, spec in scorer.questions.items():
+        if spec["type"] == MULTISELECT:
+            responses[question] = ["not an option"]
+        elif spec["type"] != SLIDER:
+            responses[question] = "not an option"
+    entry = {"score": 0, "responses": responses}
+    assert decode_entry(scorer, encode_entry(scorer, entry)) == entry
+
+
+def test_legacy_entries_pass_through():
+    scorer = SCORERS[sorted(SCORERS)[0]]
+    entry = {"score": 3, "responses": {"q1": "anything"}}
+    assert decode_entry(scorer, entry) is entry
+
+
+def test_unknown_version_is_rejected():
+    scorer = SCORERS[sorted(SCORERS)[0]]
+    with pytest.raises(ValueError):
+        decode_entry(scorer, {"v": 999, "a": []})
+
+
+def test_compact_store_reads_back_old_and_new_entries(tmp_path):
+    scorer = SCORERS[sorted(SCORERS)[0]]
+    rng = random.Random(1)
+    legacy, fresh = (new_entry(0, random_responses(scorer, rng)) for _ in range(2))
+    backend = JsonLinesStore(str(tmp_path))
+    backend.append(scorer.file, legacy)
+    store = CompactStore(backend)
+    store.append(scorer.file, fresh)
+    assert "responses" not in backend.get_entry(scorer.file, 1)
+    assert store.load(scorer.file) == [legacy, fresh]
+    assert store.get_entry(scorer.file, 1) == fresh
+
+
+@pytest.mark.parametrize("backend", ["jsonl", "sqlite"])
+def test_compact_entries_can_be_queried_by_time(tmp_path, backend):
+    from sqlite_store import SQLiteStore
+    scorer = SCORERS[sorted(SCORERS)[0]]
+    rng = random.Random(2)
+    entries = [new_entry(i, random_responses(scorer, rng)) for i in range(3)]
+    for entry, day in zip(entries, ("01", "02", "03")):
+        entry["submitted_at"] = f"2024-03-{day}T08:00:00+00:00"
+    inner = JsonLinesStore(str(tmp_path)) if backend == "jsonl" else SQLiteStore(str(tmp_path / "responses.db"))
+    store = CompactStore(inner)
+    store.append_many(scorer.file, entries)
+    page = store.query(scorer.file, since="2024-03-02", until="2024-03-03")
+    assert page == [(1, entries[1])]
@@ -0,0 +1,55 @@
+import io
+import json
+import pytest
+from json_stream import iter_json_array
+
+ENTRIES = [
+    {"score": 12.5, "text": "a \"quoted\", [bracketed] value", "name": "Zoë ☀"},
+    1234567890,
+    -0.5e-3,
+    "plain",
+    [1, [2, 3]],
+    None,
+    True,
+]
+
+
+def parse(data, chunk_size):
+    return list(iter_json_array(io.BytesIO(data), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64])
+def test_elements_split_at_any_chunk_boundary(chunk_size):
+    data = json.dumps(ENTRIES, ensure_ascii=False).encode("utf-8")
+    assert parse(data, chunk_size) == ENTRIES
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 4])
+def test_numbers_cut_at_a_chunk_boundary_are_read_whole(chunk_size):
+    assert parse(b"[12.5,  3e10 ,7]", chunk_size) == [12.5, 3e10, 7]
+
+
+def test_text_streams_are_accepted():
+    assert list(iter_json_array(io.StringIO('[{"a": 1}, 2]'), chunk_size=3)) == [{"a": 1}, 2]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 64])
+def test_utf8_bom_is_skipped(chunk_size):
+    assert parse(b"\xef\xbb\xbf" + json.dumps(ENTRIES).encode("utf-8"), chunk_size) == ENTRIES
+
+
+@pytest.mark.parametrize("data", [b"", b"  \n", b"[]", b"[ \n ]"])
+def test_empty_input_yields_nothing(data):
+    assert parse(data, 2) == []
+
+
+@pytest.mark.parametrize("data", [b"[1] 2", b"[1]]", b"[1][2]"])
+def test_trailing_data_is_an_error(data):
+    with pytest.raises(ValueError):
+        parse(data, 2)
+
+
+@pytest.mark.parametrize("data", [b"[1, 2", b'[{"a": 1}', b'["abc', b"{}", b"[1 2]", b"[1,]"])
+def test_malformed_input_is_an_error(data):
+    with pytest.raises(ValueError):
+        parse(data, 2)
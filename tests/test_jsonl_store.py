@@ -0,0 +1,35 @@
+import json
+import pytest
+from storage import JsonLinesStore
+
+FILE = "data/awareness.json"
+
+
+@pytest.fixture
+def store(tmp_path):
+    (tmp_path / "awareness.json").write_text(json.dumps([{"score": 1}, {"score": 2}]))
+    return JsonLinesStore(str(tmp_path))
+
+
+def test_count_and_get_entry_span_legacy_array_and_log(store):
+    store.append_many(FILE, [{"score": 3}, {"score": 4}])
+    assert store.count(FILE) == 4
+    assert [store.get_entry(FILE, index)["score"] for index in range(4)] == [1, 2, 3, 4]
+    with pytest.raises(IndexError):
+        store.get_entry(FILE, 4)
+    with pytest.raises(IndexError):
+        store.get_entry(FILE, -1)
+
+
+def test_offsets_follow_appends_from_other_writers(store, tmp_path):
+    assert store.count(FILE) == 2
+    JsonLinesStore(str(tmp_path)).append(FILE, {"score": 3})
+    with open(store.log_path(FILE), "a", encoding="utf-8") as f:
+        # A line another process has not finished writing yet is not counted.
+        f.write('{"score": 4')
+    assert store.count(FILE) == 3
+    with open(store.log_path(FILE), "a", encoding="utf-8") as f:
+        f.write("}\n")
+    assert store.count(FILE) == 4
+    assert store.get_entry(FILE, 3) == {"score": 4}
+    assert store.load(FILE) == [{"score": score} for score in (1, 2, 3, 4)]
@@ -0,0 +1,74 @@
+import time
+import pytest
+import storage
+from scoring import AWARENESS
+from storage import SUBMIT_STATS, StorageError, find_layer, get_store
+from tools.fake_github import FakeGitHub
+from tools.synthetic import random_entry
+
+FILE = AWARENESS.file
+
+
+@pytest.fixture
+def server():
+    server = FakeGitHub().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def store(server, tmp_path, monkeypatch):
+    """The app's full store stack on the github backend, pointed at the fake server."""
+    settings = {
+        "STORAGE_BACKEND": "github", "GITHUB_PAT": "test", "GITHUB_API_URL": server.url,
+        "LOCAL_DATA_DIR": str(tmp_path), "SPOOL_DIR": str(tmp_path / "spool"),
+        "SNAPSHOT_DIR": str(tmp_path / "snapshots"), "CACHE_TTL": "0", "HTTP_RETRIES": "0",
+        "CIRCUIT_FAILURES": "1", "CIRCUIT_RESET": "0.5", "WRITE_BEHIND_DELAY": "0.2",
+    }
+    for name, value in settings.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(storage, "_store", None)
+    store = get_store()
+    yield store
+    find_layer(store, "flush").close()
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_submit_during_outage_is_queued_once_and_replayed(server, store):
+    breaker = find_layer(store, "breaker").breaker
+    queue = find_layer(store, "pending_count")
+
+    # The backend goes down before any snapshot was taken.
+    server.error_rate = 1.0
+    with pytest.raises(StorageError):
+        store.count(FILE)
+    assert breaker.state == "open"
+
+    # The submit is acknowledged from the spool, although the index and history cannot be updated.
+    entry = random_entry(AWARENESS, "outage01")
+    store.append(FILE, entry)
+    assert queue.pending_count() == 1
+
+    # Resubmitting the same attempt is recognised as a repeat and not queued again.
+    duplicates = SUBMIT_STATS.snapshot()["duplicates"]
+    store.append(FILE, dict(entry))
+    assert queue.pending_count() == 1
+    assert SUBMIT_STATS.snapshot()["duplicates"] == duplicates + 1
+
+    # Once the backend is back the entry is written exactly once and can be found again.
+    server.error_rate = 0.0
+    assert wait_for(lambda: queue.pending_count() == 0)
+    stored = [stored for stored in store.iter_entries(FILE) if stored["key"] == entry["key"]]
+    assert len(stored) == 1
+    assert [found["key"] for _, found in store.find_respondent(FILE, "outage01")] == [entry["key"]]
+    series, trend = find_layer(store, "history").history("outage01")[FILE]
+    assert trend.count == 1
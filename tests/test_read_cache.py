@@ -0,0 +1,22 @@
+from read_cache import ReadCache
+
+PATH = "data/awareness.json"
+
+
+def test_download_started_before_a_write_does_not_replace_it():
+    cache = ReadCache()
+    cache.put(PATH, [1], "old")
+    generation = cache.generation()
+    cache.written(PATH, [1, 2], "new")
+    cache.put(PATH, [1], "old", generation=generation)
+    assert cache.get(PATH).sha == "new"
+
+
+def test_download_after_invalidation_is_kept_only_if_started_after_it():
+    cache = ReadCache()
+    generation = cache.generation()
+    cache.invalidate()
+    cache.put(PATH, [1], "old", generation=generation)
+    assert cache.get(PATH) is None
+    cache.put(PATH, [1, 2], "new", generation=cache.generation())
+    assert cache.get(PATH).sha == "new"
@@ -0,0 +1,43 @@
+import threading
+import pytest
+from read_cache import ReadCache
+from sharded_store import ShardedStore
+from storage import GitHubContentsStore
+from tools.fake_github import FakeGitHub
+
+FILE = "data/routine.json"
+
+
+@pytest.fixture
+def server():
+    server = FakeGitHub().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_concurrent_writers_keep_manifest_and_shards_in_step(server):
+    inner = GitHubContentsStore("test", user="test", repo="test", api_url=server.url, cache=ReadCache(ttl=30))
+    store = ShardedStore(inner, shard_size=7)
+
+    def submit(writer):
+        for number in range(6):
+            store.append(FILE, {"score": writer, "responses": {}, "id": f"{writer}-{number}"})
+
+    threads = [threading.Thread(target=submit, args=(writer,)) for writer in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    entries = list(store.iter_entries(FILE))
+    assert sorted(entry["id"] for entry in entries) == sorted(f"{w}-{n}" for w in range(8) for n in range(6))
+    assert store.count(FILE) == len(entries)
+    assert [store.get_entry(FILE, index) for index in range(len(entries))] == entries
+
+    manifest, _ = store.manifest(FILE, revalidate=True)
+    listed = {shard["path"] for shard in manifest["shards"]}
+    assert {path for path in server.repo.files() if path.startswith("data/routine/")} == listed | {store.manifest_path(FILE)}
+    for shard, shard_entries in store.shard_entries(FILE):
+        if shard["aggregate"] is not None:
+            assert shard["aggregate"]["count"] == len(shard_entries)
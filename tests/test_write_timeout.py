@@ -0,0 +1,67 @@
+import threading
+from circuit_breaker import CircuitBreaker, ResilientStore
+from storage import DelegatingStore, JsonLinesStore, StorageError
+from write_behind import WriteBehindStore
+
+FILE = "data/awareness.json"
+
+
+class StalledStore(DelegatingStore):
+    """Holds every write until ``release`` is set, then commits it or fails it."""
+
+    def __init__(self, inner):
+        super().__init__(inner)
+        self.release = threading.Event()
+        self.fail = False
+
+    def append_batches(self, batches):
+        self.release.wait()
+        if self.fail:
+            raise StorageError("backend error")
+        self.inner.append_batches(batches)
+
+
+def make_stack(tmp_path):
+    backend = StalledStore(JsonLinesStore(str(tmp_path / "data")))
+    breaker = CircuitBreaker(failure_threshold=3)
+    resilient = ResilientStore(backend, breaker, str(tmp_path / "snapshots"), timeout=0.1)
+    store = WriteBehindStore(resilient, str(tmp_path / "spool"), max_delay=3600,
+                             queue_when=lambda: not breaker.would_allow())
+    return backend, breaker, resilient, store
+
+
+def wait_for_writes(resilient):
+    for future in list(resilient._abandoned):
+        future.exception()
+
+
+def test_timed_out_write_is_spooled_and_not_written_twice(tmp_path):
+    backend, breaker, resilient, store = make_stack(tmp_path)
+    store.append(FILE, {"key": "a", "score": 1})
+    assert breaker.failures == 1
+    assert store.pending_count() == 1
+
+    store.flush()
+    assert "timed-out write" in store.last_error
+    assert store.pending_count() == 1
+
+    backend.release.set()
+    wait_for_writes(resilient)
+    store.flush()
+    assert store.pending_count() == 0
+    assert [entry["key"] for entry in backend.load(FILE)] == ["a"]
+    store.close()
+
+
+def test_timed_out_write_that_failed_is_replayed(tmp_path):
+    backend, breaker, resilient, store = make_stack(tmp_path)
+    backend.fail = True
+    store.append(FILE, {"key": "a", "score": 1})
+    backend.release.set()
+    wait_for_writes(resilient)
+
+    backend.fail = False
+    store.flush()
+    assert store.pending_count() == 0
+    assert [entry["key"] for entry in backend.load(FILE)] == ["a"]
+    store.close()
@@ -0,0 +1,144 @@
+import gc
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+import analyze_awareness
+import analyze_routine
+import analyze_wellbeing
+import analyze_activities
+from aggregates import ScoreAggregate
+from batch_scoring import classify_batch
+from scoring import SCORERS
+from storage import summarize_scores
+from tools.synthetic import random_responses
+
+BASELINE = os.path.join("benchmarks", "baseline.json")
+RESULTS = os.path.join("benchmarks", "results.json")
+SIZES = (1_000, 100_000, 1_000_000)
+
+# Relative slowdown (or memory growth) tolerated before a case counts as a regression
+TOLERANCE = 0.25
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.005
+MIN_BYTES = 64 * 1024
+
+# Survey name -> (classify function, analyze_responses) as used by the analysis pages
+SURVEYS = {
+    "awareness": (analyze_awareness.classify_responses, analyze_awareness.analyze_responses),
+    "routine": (analyze_routine.classify_routine, analyze_routine.analyze_responses),
+    "wellbeing": (analyze_wellbeing.classify_wellbeing, analyze_wellbeing.analyze_responses),
+    "activities": (analyze_activities.classify_activities, analyze_activities.analyze_responses),
+}
+
+
+def cases(survey):
+    """``(name, function(responses, entries))`` for every hot path benchmarked on a survey."""
+    classify, analyze = SURVEYS[survey]
+    return [
+        (f"classify:{survey}", lambda responses, entries: [classify(r) for r in responses]),
+        (f"analyze_responses:{survey}", lambda responses, entries: [analyze(r) for r in responses]),
+        (f"classify_batch:{survey}", lambda responses, entries: classify_batch(survey, responses)),
+        (f"results_average:{survey}", lambda responses, entries: summarize_scores(e["score"] for e in entries)),
+        (f"aggregate:{survey}", lambda responses, entries: ScoreAggregate.from_entries(entries)),
+    ]
+
+
+def measure(function, responses, entries, repeat):
+    """Best wall time over ``repeat`` runs, then the tracemalloc peak of one more run."""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(responses, entries)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function(responses, entries)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes, surveys, repeat, seed=0):
+    results = []
+    for size in sizes:
+        for survey in surveys:
+            scorer = SCORERS[survey]
+            rng = random.Random(seed)
+            responses = [random_responses(scorer, rng) for _ in range(size)]
+            entries = [{"score": scorer.score(r), "responses": r} for r in responses]
+            for name, function in cases(survey):
+                seconds, peak = measure(function, responses, entries, repeat if size < 1_000_000 else 1)
+                results.append({"name": name, "size": size, "seconds": seconds, "peak_bytes": peak})
+                print(f"{name:32} {size:>9,}  {seconds * 1000:10.1f} ms  {peak / 1024 / 1024:8.1f} MiB",
+                      file=sys.stderr)
+            del responses, entries
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Return human-readable regressions of ``results`` against ``baseline`` results."""
+    known = {(case["name"], case["size"]): case for case in baseline}
+    regressions = []
+    for case in results:
+        before = known.get((case["name"], case["size"]))
+        if before is None:
+            continue
+        for key, floor, unit in (("seconds", MIN_SECONDS, "s"), ("peak_bytes", MIN_BYTES, "B")):
+            old, new = before[key], case[key]
+            if new > old * (1 + tolerance) and new - old > floor:
+                regressions.append(
+                    f"{case['name']} @ {case['size']:,}: {key} {old:.4g}{unit} -> {new:.4g}{unit} "
+                    f"(+{(new / old - 1) if old else float('inf'):.0%})"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scoring, classification and aggregation hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--surveys", nargs="+", choices=list(SURVEYS), default=list(SURVEYS))
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (1 at 1M entries)")
+    parser.add_argument("--out", default=RESULTS, help="where to write the results as JSON")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.surveys, args.repeat)
+    report = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    for path in [args.out] + ([args.baseline] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+    if args.save_baseline:
+        return 0
+    if not os.path.exists(args.baseline):
+        # A check that cannot compare anything must not pass.
+        print(f"No baseline at {args.baseline}; run with --save-baseline on the reference machine to create one.")
+        return 1
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    known = {(case["name"], case["size"]) for case in baseline}
+    uncovered = [case for case in results if (case["name"], case["size"]) not in known]
+    if uncovered:
+        sizes = sorted({case["size"] for case in uncovered})
+        print(f"{len(uncovered)} cases not in the baseline (sizes {', '.join(f'{size:,}' for size in sizes)})")
+    print(f"{len(results) - len(uncovered)} cases compared, {len(regressions)} regressions against {args.baseline}")
+    return 1 if regressions or len(uncovered) == len(results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
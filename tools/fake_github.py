@@ -0,0 +1,280 @@
+import sys
+import json
+import time
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def git_sha(kind, data):
+    """SHA-1 the way git names objects, so SHAs look and behave like GitHub's."""
+    return hashlib.sha1(f"{kind} {len(data)}\0".encode() + data).hexdigest()
+
+
+class FakeRepo:
+    """In-memory repository state shared by all request threads.
+
+    Keeps real git-style objects (blobs, trees, commits) behind a single branch,
+    so the Contents API and the Git Data API see the same files and conflict
+    the same way GitHub does.
+    """
+
+    def __init__(self, branch="main", rate_limit=5000, rate_window=3600):
+        self.branch = branch
+        self.lock = threading.Lock()
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.rate_remaining = rate_limit
+        self.rate_reset = time.time() + rate_window
+        self.requests = 0
+        self.head = self._commit(self._tree({}), [], "Initial commit")
+
+    def _blob(self, data):
+        sha = git_sha("blob", data)
+        self.blobs[sha] = data
+        return sha
+
+    def _tree(self, files):
+        sha = git_sha("tree", json.dumps(files, sort_keys=True).encode())
+        self.trees[sha] = dict(files)
+        return sha
+
+    def _commit(self, tree, parents, message):
+        body = json.dumps({"tree": tree, "parents": parents, "message": message, "time": time.time()}).encode()
+        sha = git_sha("commit", body)
+        self.commits[sha] = {"tree": tree, "parents": parents, "message": message}
+        return sha
+
+    def files(self):
+        return self.trees[self.commits[self.head]["tree"]]
+
+    def read(self, path):
+        """Return ``(bytes, blob_sha)`` for a path at the branch head, or ``(None, None)``."""
+        sha = self.files().get(path)
+        return (self.blobs[sha], sha) if sha else (None, None)
+
+    def put(self, path, data, message):
+        files = dict(self.files())
+        files[path] = self._blob(data)
+        self.head = self._commit(self._tree(files), [self.head], message)
+        return files[path]
+
+    def seed(self, path, data):
+        with self.lock:
+            self.put(path, data, f"Seed {path}")
+
+    def spend(self):
+        """Consume one unit of rate limit; returns False once the budget is exhausted."""
+        now = time.time()
+        if now >= self.rate_reset:
+            self.rate_remaining = self.rate_limit
+            self.rate_reset = now + self.rate_window
+        self.requests += 1
+        if self.rate_remaining <= 0:
+            return False
+        self.rate_remaining -= 1
+        return True
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "FakeGitHub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    @property
+    def repo(self):
+        return self.server.repo
+
+    def _send(self, status, body=None, headers=None, raw=None):
+        payload = raw if raw is not None else (json.dumps(body).encode() if body is not None else b"")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream" if raw is not None else "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("X-RateLimit-Limit", str(self.repo.rate_limit))
+        self.send_header("X-RateLimit-Remaining", str(max(self.repo.rate_remaining, 0)))
+        self.send_header("X-RateLimit-Reset", str(int(self.repo.rate_reset)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _route(self, method):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) < 4 or parts[0] != "repos":
+            return self._send(404, {"message": "Not Found"})
+        body = self._body() if method in ("PUT", "POST", "PATCH") else None
+
+        delay = self.server.latency + random.uniform(0, self.server.jitter)
+        if delay:
+            time.sleep(delay)
+        if random.random() < self.server.error_rate:
+            return self._send(502, {"message": "Injected failure"})
+
+        with self.repo.lock:
+            # 304s do not count against the budget on GitHub either.
+            if not self.repo.spend():
+                return self._send(403, {"message": "API rate limit exceeded"})
+            kind, rest = parts[3], parts[4:]
+            if kind == "contents":
+                return self._contents(method, "/".join(rest), body)
+            if kind == "git":
+                return self._git(method, rest, body, parse_qs(url.query))
+        return self._send(404, {"message": "Not Found"})
+
+    def _contents(self, method, path, body):
+        data, sha = self.repo.read(path)
+        if method == "GET":
+            if data is None:
+                return self._send(404, {"message": "Not Found"})
+            etag = f'"{sha}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.repo.rate_remaining += 1
+                return self._send(304, headers={"ETag": etag})
+            if "raw" in (self.headers.get("Accept") or ""):
+                return self._send(200, raw=data, headers={"ETag": etag})
+            return self._send(200, {
+                "path": path, "sha": sha, "size": len(data), "encoding": "base64",
+                "content": base64.encodebytes(data).decode() if len(data) <= self.server.inline_limit else "",
+            }, headers={"ETag": etag})
+        if method == "PUT":
+            if data is not None and not body.get("sha"):
+                return self._send(422, {"message": "Invalid request. \"sha\" wasn't supplied."})
+            if data is not None and body["sha"] != sha:
+                return self._send(409, {"message": f"{path} does not match {body['sha']}"})
+            if data is None and body.get("sha"):
+                return self._send(409, {"message": f"{path} does not exist"})
+            new_sha = self.repo.put(path, base64.b64decode(body["content"]), body.get("message", ""))
+            return self._send(201 if data is None else 200, {"content": {"path": path, "sha": new_sha}})
+        return self._send(405, {"message": "Method Not Allowed"})
+
+    def _git(self, method, rest, body, query):
+        repo = self.repo
+        if method == "GET" and rest[:2] == ["ref", "heads"]:
+            if "/".join(rest[2:]) != repo.branch:
+                return self._send(404, {"message": "Not Found"})
+            return self._send(200, {"ref": f"refs/heads/{repo.branch}", "object": {"sha": repo.head, "type": "commit"}})
+        if method == "GET" and rest[0] == "commits" and rest[1] in repo.commits:
+            commit = repo.commits[rest[1]]
+            return self._send(200, {"sha": rest[1], "tree": {"sha": commit["tree"]}, "parents": [
+                {"sha": parent} for parent in commit["parents"]
+            ]})
+        if method == "GET" and rest[0] == "trees" and rest[1] in repo.trees:
+            return self._send(200, {"sha": rest[1], "truncated": False, "tree": [
+                {"path": path, "mode": "100644", "type": "blob", "sha": sha}
+                for path, sha in sorted(repo.trees[rest[1]].items())
+            ]})
+        if method == "GET" and rest[0] == "blobs" and rest[1] in repo.blobs:
+            data = repo.blobs[rest[1]]
+            if "raw" in (self.headers.get("Accept") or ""):
+                return self._send(200, raw=data)
+            return self._send(200, {"sha": rest[1], "encoding": "base64", "content": base64.encodebytes(data).decode()})
+        if method == "POST" and rest == ["blobs"]:
+            content = body["content"]
+            data = base64.b64decode(content) if body.get("encoding") == "base64" else content.encode("utf-8")
+            return self._send(201, {"sha": repo._blob(data)})
+        if method == "POST" and rest == ["trees"]:
+            files = dict(repo.trees.get(body.get("base_tree"), {}))
+            for item in body["tree"]:
+                files[item["path"]] = item["sha"]
+            return self._send(201, {"sha": repo._tree(files)})
+        if method == "POST" and rest == ["commits"]:
+            return self._send(201, {"sha": repo._commit(body["tree"], body["parents"], body.get("message", ""))})
+        if method == "PATCH" and rest[:2] == ["refs", "heads"]:
+            commit = repo.commits.get(body["sha"])
+            if commit is None:
+                return self._send(422, {"message": "Object does not exist"})
+            if repo.head not in commit["parents"] and not body.get("force"):
+                return self._send(422, {"message": "Update is not a fast forward"})
+            repo.head = body["sha"]
+            return self._send(200, {"ref": f"refs/heads/{repo.branch}", "object": {"sha": repo.head}})
+        return self._send(404, {"message": "Not Found"})
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PATCH(self):
+        self._route("PATCH")
+
+
+class FakeGitHub(ThreadingHTTPServer):
+    """A local stand-in for the GitHub endpoints this app uses.
+
+    Run ``python -m tools.fake_github --seed .`` and point ``GITHUB_API_URL`` at
+    it to use the app offline, or start it in-process as ``tools.loadgen`` does.
+
+    ``latency``/``jitter`` add a delay (seconds) to every request and
+    ``error_rate`` turns that fraction of requests into 502s.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_limit=5000, inline_limit=1024 * 1024, verbose=False):
+        super().__init__((host, port), Handler)
+        self.repo = FakeRepo(rate_limit=rate_limit)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.inline_limit = inline_limit
+        self.verbose = verbose
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve from a background thread; returns the server for chaining."""
+        threading.Thread(target=self.serve_forever, name="fake-github", daemon=True).start()
+        return self
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local fake of the GitHub Contents and Git Data APIs.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra seconds, up to this value")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 502")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="requests allowed per hour")
+    parser.add_argument("--seed", metavar="DIR", help="load data/*.json from this checkout")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    server = FakeGitHub(port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        rate_limit=args.rate_limit, verbose=args.verbose)
+    if args.seed:
+        import glob
+        import os
+        for path in sorted(glob.glob(os.path.join(args.seed, "data", "*.json"))):
+            with open(path, "rb") as f:
+                server.repo.seed(os.path.relpath(path, args.seed).replace(os.sep, "/"), f.read())
+    print(f"Fake GitHub API listening on {server.url} (set GITHUB_API_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import base64
+import random
+import argparse
+import tempfile
+import threading
+import requests
+from scoring import SCORERS
+from read_cache import ReadCache
+from storage import GitHubContentsStore, JsonLinesStore, ResponseStore, StorageError
+from tools.fake_github import FakeGitHub
+from tools.synthetic import random_entry
+
+TOKEN = "loadgen"
+
+
+class NaiveContentsStore(ResponseStore):
+    """The submit path the survey pages used before the response store existed.
+
+    Reads the file, reads it again for its SHA and PUTs the result, without
+    retries; a failed read is treated as an empty file. Kept here as the
+    baseline the other strategies are measured against.
+    """
+
+    def __init__(self, api_url):
+        self.api_url = api_url
+
+    def _url(self, file_name):
+        return f"{self.api_url}/repos/loadgen/loadgen/contents/{file_name}"
+
+    def _headers(self):
+        return {"Authorization": f"token {TOKEN}", "Accept": "application/vnd.github.v3+json"}
+
+    def load(self, file_name):
+        response = requests.get(self._url(file_name), headers=self._headers())
+        content = response.json().get("content", "") if response.status_code == 200 else ""
+        return json.loads(base64.b64decode(content).decode("utf-8")) if content else []
+
+    def append(self, file_name, entry):
+        data = self.load(file_name)
+        data.append(entry)
+        response = requests.get(self._url(file_name), headers=self._headers())
+        sha = response.json().get("sha") if response.status_code == 200 else None
+        payload = {
+            "message": f"Update {file_name} with new responses",
+            "content": base64.b64encode(json.dumps(data, indent=4).encode("utf-8")).decode("utf-8"),
+        }
+        if sha:
+            payload["sha"] = sha
+        response = requests.put(self._url(file_name), headers=self._headers(), json=payload)
+        if response.status_code not in (200, 201):
+            raise StorageError(f"Failed to save {file_name}. Error {response.status_code}")
+
+    def query(self, file_name, limit=20, **filters):
+        # The old analysis pages always loaded the whole file.
+        return list(enumerate(self.load(file_name)))[:limit]
+
+
+def _write_behind(url, workdir):
+    from write_behind import WriteBehindStore
+    inner = GitHubContentsStore(TOKEN, user="loadgen", repo="loadgen", api_url=url, cache=ReadCache(ttl=5))
+    return WriteBehindStore(inner, os.path.join(workdir, "spool"), max_batch=50, max_delay=0.5)
+
+
+def _git(url, workdir):
+    from git_data_store import GitDataStore
+    return GitDataStore(TOKEN, user="loadgen", repo="loadgen", api_url=url)
+
+
+def _sqlite(url, workdir):
+    from sqlite_store import SQLiteStore
+    return SQLiteStore(os.path.join(workdir, "responses.db"))
+
+
+# Strategy name -> (needs the fake GitHub server, factory(url, workdir))
+STRATEGIES = {
+    "naive": (True, lambda url, workdir: NaiveContentsStore(url)),
+    "contents": (True, lambda url, workdir: GitHubContentsStore(
+        TOKEN, user="loadgen", repo="loadgen", api_url=url, cache=ReadCache(ttl=5),
+    )),
+    "write_behind": (True, _write_behind),
+    "git": (True, _git),
+    "jsonl": (False, lambda url, workdir: JsonLinesStore(workdir)),
+    "sqlite": (False, _sqlite),
+}
+
+
+def percentile(values, q):
+    """Nearest-rank ``q``-th percentile of ``values``, or ``None`` if empty."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(1, math.ceil(q / 100 * len(values))) - 1]
+
+
+def _respondent(store, number, args, stats, lock):
+    rng = random.Random(args.seed + number)
+    respondent = f"loadgen{number:04d}"
+    scorers = list(SCORERS.values())
+    for _ in range(args.submissions):
+        scorer = rng.choice(scorers)
+        entry = random_entry(scorer, respondent, rng)
+        entry["loadgen_id"] = uuid.uuid4().hex
+        start = time.perf_counter()
+        try:
+            store.append(scorer.file, entry)
+        except StorageError:
+            with lock:
+                stats["failed"] += 1
+        else:
+            elapsed = time.perf_counter() - start
+            with lock:
+                stats["submit_latency"].append(elapsed)
+                stats["acked"].add(entry["loadgen_id"])
+        if rng.random() < args.browse:
+            start = time.perf_counter()
+            try:
+                store.query(rng.choice(scorers).file, limit=10)
+            except StorageError:
+                pass
+            else:
+                with lock:
+                    stats["browse_latency"].append(time.perf_counter() - start)
+        if args.think:
+            time.sleep(rng.uniform(0, args.think))
+
+
+def run_strategy(name, args):
+    """Drive one strategy with ``args.respondents`` concurrent respondents and check what was stored."""
+    needs_server, factory = STRATEGIES[name]
+    server = None
+    if needs_server:
+        server = FakeGitHub(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                            rate_limit=1_000_000).start()
+    with tempfile.TemporaryDirectory(prefix=f"loadgen-{name}-") as workdir:
+        store = factory(server.url if server else None, workdir)
+        stats = {"failed": 0, "submit_latency": [], "browse_latency": [], "acked": set()}
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(target=_respondent, args=(store, number, args, stats, lock), name=f"respondent-{number}")
+            for number in range(args.respondents)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if hasattr(store, "close"):
+            # Write-behind acknowledges before writing; count what actually reached the backend.
+            store.close()
+            store = store.inner
+
+        requests_made = server.repo.requests if server else None
+        if server:
+            server.error_rate = 0.0
+        stored = [
+            entry.get("loadgen_id") for scorer in SCORERS.values() for entry in store.iter_entries(scorer.file)
+        ]
+        if server:
+            server.shutdown()
+            server.server_close()
+
+    submits, browses = stats["submit_latency"], stats["browse_latency"]
+    return {
+        "strategy": name,
+        "submitted": len(submits),
+        "failed": stats["failed"],
+        "lost": len(stats["acked"] - set(stored)),
+        "duplicated": len(stored) - len(set(stored)),
+        "seconds": elapsed,
+        "throughput": len(submits) / elapsed if elapsed else 0.0,
+        **{f"submit_p{q}_ms": _ms(percentile(submits, q)) for q in (50, 95, 99)},
+        **{f"browse_p{q}_ms": _ms(percentile(browses, q)) for q in (50, 95, 99)},
+        "requests": requests_made,
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def print_report(results):
+    columns = [
+        ("strategy", "Strategy", "{}"), ("submitted", "OK", "{}"), ("failed", "Failed", "{}"),
+        ("lost", "Lost", "{}"), ("throughput", "Submits/s", "{:.1f}"), ("submit_p50_ms", "p50 ms", "{}"),
+        ("submit_p95_ms", "p95 ms", "{}"), ("submit_p99_ms", "p99 ms", "{}"),
+        ("browse_p50_ms", "Browse p50", "{}"), ("requests", "API calls", "{}"),
+    ]
+    rows = [[header for _, header, _ in columns]]
+    for result in results:
+        rows.append([
+            "-" if result[key] is None else template.format(result[key]) for key, _, template in columns
+        ])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    for row in rows:
+        print("  ".join(cell.rjust(width) if i else cell.ljust(width) for i, (cell, width) in enumerate(zip(row, widths))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simulate concurrent respondents submitting and browsing against each storage strategy.",
+    )
+    parser.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument("--respondents", type=int, default=10, help="concurrent respondents")
+    parser.add_argument("--submissions", type=int, default=5, help="submissions per respondent")
+    parser.add_argument("--browse", type=float, default=0.5, help="chance of a browse after each submit")
+    parser.add_argument("--think", type=float, default=0.0, help="max seconds between a respondent's actions")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every fake GitHub request")
+    parser.add_argument("--jitter", type=float, default=0.02, help="random extra seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 502")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.strategies:
+        print(f"Running {name}...", file=sys.stderr)
+        results.append(run_strategy(name, args))
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
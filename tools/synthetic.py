@@ -0,0 +1,30 @@
+import random
+from scoring import MULTISELECT, SCORERS, SLIDER
+from storage import new_entry
+
+
+def random_responses(scorer, rng=random):
+    """One random, valid answer per question of a survey, shaped like the survey form's."""
+    responses = {}
+    for question, spec in scorer.questions.items():
+        if spec["type"] == SLIDER:
+            responses[question] = rng.randint(spec["min"], spec["max"])
+        elif spec["type"] == MULTISELECT:
+            options = scorer.options[question]
+            responses[question] = [option for option in options if rng.random() < 0.5]
+        else:
+            responses[question] = rng.choice(scorer.options[question])
+    return responses
+
+
+def random_entry(scorer, respondent=None, rng=random):
+    """A scored entry as the survey page would submit it."""
+    responses = random_responses(scorer, rng)
+    return new_entry(scorer.score(responses), responses, respondent)
+
+
+def random_entries(survey, count, seed=0):
+    """``count`` reproducible random entries for a survey (name or scorer)."""
+    scorer = SCORERS[survey] if isinstance(survey, str) else survey
+    rng = random.Random(seed)
+    return [random_entry(scorer, rng=rng) for _ in range(count)]
@@ -0,0 +1,259 @@
+import os
+import json
+import atexit
+import threading
+from dedup import entry_key
+from storage import DelegatingStore, StorageError, WriteTimeout, entry_matches, find_layer, summarize_scores
+
+
+class WriteBehindStore(DelegatingStore):
+    """Acknowledges submissions once they are on a local spool and flushes them in batches.
+
+    ``append`` only writes a line to ``<spool_dir>/<survey>.jsonl`` (fsynced, so an
+    acknowledged submission survives a restart). A background thread hands the
+    spooled entries to the backing store (one commit per survey file, or a single
+    commit for all of them on backends with atomic batches) as soon as ``max_batch`` entries are waiting or ``max_delay`` seconds have
+    passed. Remaining entries are flushed when the process exits.
+
+    While a batch is being flushed its spool file is renamed to
+    ``<survey>.flushing.jsonl``; if the flush fails the file is kept and retried
+    first on the next round, so entries are never dropped or reordered. Reads
+    combine the backing store with the spool, so a read that overlaps a flush can
+    briefly count a batch twice.
+
+    With a ``queue_when`` predicate the spool is only used while it returns true
+    (or a write fails while it does) and entries are otherwise written straight
+    through; once anything is spooled, later entries queue behind it to keep
+    submission order.
+
+    A write that times out (``WriteTimeout``) is always spooled, but it may still
+    be committed by the backend. Such entries are marked ``unsure``: they are only
+    flushed once no timed-out write is still running, and are dropped if their
+    key is already stored.
+    """
+
+    def __init__(self, inner, spool_dir, max_batch=50, max_delay=10.0, queue_when=None):
+        super().__init__(inner)
+        self.queue_when = queue_when
+        self.spool_dir = spool_dir
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        os.makedirs(spool_dir, exist_ok=True)
+        self._pending = sum(len(records) for records in self._spooled().values())
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _spool_path(self, file_name, flushing=False):
+        stem = os.path.splitext(os.path.basename(file_name))[0]
+        suffix = ".flushing.jsonl" if flushing else ".jsonl"
+        return os.path.join(self.spool_dir, stem + suffix)
+
+    @staticmethod
+    def _read_spool(path):
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _spooled(self):
+        """Return ``{file_name: [records]}`` for everything waiting on the spool."""
+        pending = {}
+        for name in sorted(os.listdir(self.spool_dir)):
+            if name.endswith(".jsonl"):
+                for record in self._read_spool(os.path.join(self.spool_dir, name)):
+                    pending.setdefault(record["file"], []).append(record)
+        return pending
+
+    def pending(self, file_name):
+        """Entries for a survey that are acknowledged but not yet in the backing store."""
+        with self._lock:
+            records = self._read_spool(self._spool_path(file_name, flushing=True))
+            records += self._read_spool(self._spool_path(file_name))
+        return [record["entry"] for record in records]
+
+    def pending_count(self):
+        return self._pending
+
+    def append_batches(self, batches):
+        groups = [batches] if self.inner.atomic_batches else [{name: entries} for name, entries in batches.items()]
+        for group in groups:
+            if self.queue_when is not None and not self._pending and not self.queue_when():
+                try:
+                    self.inner.append_batches(group)
+                    continue
+                except WriteTimeout:
+                    for file_name, entries in group.items():
+                        self._spool(file_name, entries, unsure=True)
+                    continue
+                except StorageError:
+                    if not self.queue_when():
+                        raise
+            for file_name, entries in group.items():
+                self._spool(file_name, entries)
+
+    @staticmethod
+    def _record(file_name, entry, unsure=False):
+        record = {"file": file_name, "entry": entry}
+        if unsure:
+            record["unsure"] = True
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    def _spool(self, file_name, entries, unsure=False):
+        lines = "".join(self._record(file_name, entry, unsure) for entry in entries)
+        with self._lock:
+            with open(self._spool_path(file_name), "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending += len(entries)
+            if self._pending >= self.max_batch:
+                self._wake.set()
+
+    def flush(self):
+        """Push every spooled entry to the backing store.
+
+        Backends with atomic multi-file commits get everything in one
+        ``append_batches`` call; otherwise each survey file is flushed (and can
+        fail) on its own.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batches = {}
+                for file_name in sorted(self._spooled()):
+                    flushing = self._spool_path(file_name, flushing=True)
+                    # A batch left over from a failed flush goes out before newer entries.
+                    if not os.path.exists(flushing) and os.path.exists(self._spool_path(file_name)):
+                        os.replace(self._spool_path(file_name), flushing)
+                    records = self._read_spool(flushing)
+                    if records:
+                        batches[file_name] = records
+
+            groups = [batches] if self.inner.atomic_batches else [{name: records} for name, records in batches.items()]
+            for group in groups:
+                try:
+                    batch = self._unstored(group)
+                    if batch:
+                        self.inner.append_batches(batch)
+                except Exception as e:
+                    # Kept on the spool and retried; layers below never raise once the commit is made.
+                    if isinstance(e, WriteTimeout):
+                        self._mark_unsure(group)
+                    self.last_error = str(e)
+                    continue
+                with self._lock:
+                    for file_name, records in group.items():
+                        os.remove(self._spool_path(file_name, flushing=True))
+                        self._pending -= len(records)
+                self.last_error = None
+
+    def _unstored(self, group):
+        """The entries of ``group`` to write, leaving out unsure ones that already landed."""
+        writer = find_layer(self.inner, "writes_in_flight")
+        batch = {}
+        for file_name, records in group.items():
+            if writer is not None and any(record.get("unsure") for record in records):
+                if writer.writes_in_flight():
+                    raise StorageError("Waiting for a timed-out write to finish before retrying it.")
+                # Ask the backend itself: a stale local snapshot could hide the entry.
+                stored = {entry_key(entry) for entry in writer.inner.iter_entries(file_name)}
+                records = [
+                    record for record in records
+                    if not (record.get("unsure") and entry_key(record["entry"]) in stored)
+                ]
+            if records:
+                batch[file_name] = [record["entry"] for record in records]
+        return batch
+
+    def _mark_unsure(self, group):
+        """Mark a batch whose write timed out, so its retry first checks what landed."""
+        with self._lock:
+            for file_name, records in group.items():
+                path = self._spool_path(file_name, flushing=True)
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    f.writelines(self._record(file_name, record["entry"], unsure=True) for record in records)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(path + ".tmp", path)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.max_delay)
+            self._wake.clear()
+            try:
+                # While only queueing under pressure, spend API calls on full batches only.
+                if self.queue_when is not None and self._pending < self.max_batch and self.queue_when():
+                    continue
+                self.flush()
+            except Exception as e:
+                # Whatever went wrong, the spool is intact; keep the flusher alive to retry.
+                self.last_error = str(e)
+
+    def close(self):
+        """Stop the background thread and flush whatever is still spooled."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout=self.max_delay)
+        self.flush()
+
+    def load(self, file_name):
+        return self.inner.load(file_name) + self.pending(file_name)
+
+    def iter_entries(self, file_name):
+        yield from self.inner.iter_entries(file_name)
+        yield from self.pending(file_name)
+
+    def count(self, file_name):
+        return self.inner.count(file_name) + len(self.pending(file_name))
+
+    def get_entry(self, file_name, index):
+        stored = self.inner.count(file_name)
+        if index < stored:
+            return self.inner.get_entry(file_name, index)
+        return self.pending(file_name)[index - stored]
+
+    def query(self, file_name, min_score=None, max_score=None, since=None, until=None, after=None, limit=20):
+        page = self.inner.query(file_name, min_score=min_score, max_score=max_score, since=since, until=until,
+                                after=after, limit=limit)
+        if len(page) < limit:
+            # Pending entries come after everything already stored.
+            stored = self.inner.count(file_name)
+            for offset, entry in enumerate(self.pending(file_name)):
+                position = stored + offset
+                if (after is None or position > after) and entry_matches(entry, min_score, max_score, since, until):
+                    page.append((position, entry))
+                    if len(page) == limit:
+                        break
+        return page
+
+    def find_respondent(self, file_name, respondent):
+        found = self.inner.find_respondent(file_name, respondent)
+        stored = self.inner.count(file_name)
+        found.extend(
+            (stored + offset, entry) for offset, entry in enumerate(self.pending(file_name))
+            if entry.get("respondent") == respondent
+        )
+        return found
+
+    def summary(self, file_name):
+        stored = self.inner.summary(file_name)
+        pending = summarize_scores(entry["score"] for entry in self.pending(file_name))
+        if not pending["count"]:
+            return stored
+        if not stored["count"]:
+            return pending
+        count = stored["count"] + pending["count"]
+        return {
+            "count": count,
+            "mean": (stored["mean"] * stored["count"] + pending["mean"] * pending["count"]) / count,
+            "min": min(stored["min"], pending["min"]),
+            "max": max(stored["max"], pending["max"]),
+        }